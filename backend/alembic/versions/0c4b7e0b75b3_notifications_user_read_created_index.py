@@ -0,0 +1,42 @@
+"""composite notifications (user_id, is_read, created_at) index
+
+Revision ID: 0c4b7e0b75b3
+Revises: 8fb8fa0d82e0
+Create Date: 2026-10-14 11:04:05.261395
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c4b7e0b75b3'
+down_revision: Union[str, Sequence[str], None] = '8fb8fa0d82e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves both read-status filters; supersedes the unread-only partial index
+    op.create_index(
+        'ix_notifications_user_read_created',
+        'notifications',
+        ['user_id', 'is_read', sa.text('created_at DESC')],
+        unique=False,
+    )
+    op.drop_index('ix_notifications_user_unread', table_name='notifications')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_notifications_user_unread',
+        'notifications',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_read = false'),
+    )
+    op.drop_index('ix_notifications_user_read_created', table_name='notifications')
@@ -0,0 +1,46 @@
+"""replace activity_logs single-column indexes with composites
+
+Revision ID: 187c0a4118a3
+Revises: 44aeec89d912
+Create Date: 2026-10-14 10:24:46.552019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '187c0a4118a3'
+down_revision: Union[str, Sequence[str], None] = '44aeec89d912'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f('ix_activity_logs_organization_id'), table_name='activity_logs')
+    op.drop_index(op.f('ix_activity_logs_user_id'), table_name='activity_logs')
+    op.drop_index(op.f('ix_activity_logs_created_at'), table_name='activity_logs')
+    op.drop_index(op.f('ix_activity_logs_resource_id'), table_name='activity_logs')
+    op.create_index('ix_al_org_created', 'activity_logs', ['organization_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_al_user_created', 'activity_logs', ['user_id', sa.text('created_at DESC')], unique=False)
+    op.create_index(
+        'ix_al_resource',
+        'activity_logs',
+        ['resource_type', 'resource_id'],
+        unique=False,
+        postgresql_where=sa.text('resource_id IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_al_resource', table_name='activity_logs')
+    op.drop_index('ix_al_user_created', table_name='activity_logs')
+    op.drop_index('ix_al_org_created', table_name='activity_logs')
+    op.create_index(op.f('ix_activity_logs_resource_id'), 'activity_logs', ['resource_id'], unique=False)
+    op.create_index(op.f('ix_activity_logs_created_at'), 'activity_logs', ['created_at'], unique=False)
+    op.create_index(op.f('ix_activity_logs_user_id'), 'activity_logs', ['user_id'], unique=False)
+    op.create_index(op.f('ix_activity_logs_organization_id'), 'activity_logs', ['organization_id'], unique=False)
@@ -0,0 +1,47 @@
+"""match activity_logs composites to keyset order
+
+Revision ID: 2559972ee18a
+Revises: e10c61c5a104
+Create Date: 2026-10-14 10:40:36.681862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2559972ee18a'
+down_revision: Union[str, Sequence[str], None] = 'e10c61c5a104'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Feeds order by (created_at DESC, id DESC); carrying id in the index lets the
+    # org/user feeds walk it without an incremental sort on created_at ties.
+    op.drop_index('ix_al_org_created', table_name='activity_logs')
+    op.drop_index('ix_al_user_created', table_name='activity_logs')
+    op.create_index('ix_al_org_created', 'activity_logs', ['organization_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    op.create_index('ix_al_user_created', 'activity_logs', ['user_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+    # Most rows are logged with a resource_type, but system events are not; skip NULLs.
+    op.drop_index(op.f('ix_activity_logs_resource_type'), table_name='activity_logs')
+    op.create_index(
+        'ix_al_resource_type',
+        'activity_logs',
+        ['resource_type'],
+        unique=False,
+        postgresql_where=sa.text('resource_type IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_al_resource_type', table_name='activity_logs')
+    op.create_index(op.f('ix_activity_logs_resource_type'), 'activity_logs', ['resource_type'], unique=False)
+    op.drop_index('ix_al_user_created', table_name='activity_logs')
+    op.drop_index('ix_al_org_created', table_name='activity_logs')
+    op.create_index('ix_al_org_created', 'activity_logs', ['organization_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_al_user_created', 'activity_logs', ['user_id', sa.text('created_at DESC')], unique=False)
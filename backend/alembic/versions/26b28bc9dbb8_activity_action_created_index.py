@@ -0,0 +1,32 @@
+"""activity_logs action keyset index
+
+Revision ID: 26b28bc9dbb8
+Revises: e2fce86d1e8b
+Create Date: 2026-10-14 11:39:50.262267
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '26b28bc9dbb8'
+down_revision: Union[str, Sequence[str], None] = 'e2fce86d1e8b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Action-filtered feeds walk (action, created_at DESC, id DESC) in keyset order;
+    # the composite also covers plain action lookups, so the single-column index goes.
+    op.drop_index(op.f('ix_activity_logs_action'), table_name='activity_logs')
+    op.create_index('ix_al_action_created', 'activity_logs', ['action', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_al_action_created', table_name='activity_logs')
+    op.create_index(op.f('ix_activity_logs_action'), 'activity_logs', ['action'], unique=False)
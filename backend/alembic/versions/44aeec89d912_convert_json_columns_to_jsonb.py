@@ -0,0 +1,55 @@
+"""convert activity_logs.details and notifications.extra_data to jsonb
+
+Revision ID: 44aeec89d912
+Revises: 97705e9073f3
+Create Date: 2026-10-14 10:24:19.294915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '44aeec89d912'
+down_revision: Union[str, Sequence[str], None] = '97705e9073f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'activity_logs', 'details',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        existing_type=postgresql.JSON(astext_type=sa.Text()),
+        existing_nullable=True,
+        postgresql_using='details::jsonb',
+    )
+    op.alter_column(
+        'notifications', 'extra_data',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        existing_type=postgresql.JSON(astext_type=sa.Text()),
+        existing_nullable=True,
+        postgresql_using='extra_data::jsonb',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'notifications', 'extra_data',
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        existing_nullable=True,
+        postgresql_using='extra_data::json',
+    )
+    op.alter_column(
+        'activity_logs', 'details',
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        existing_nullable=True,
+        postgresql_using='details::json',
+    )
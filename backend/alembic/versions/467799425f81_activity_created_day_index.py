@@ -0,0 +1,33 @@
+"""add UTC day expression index on activity_logs
+
+Revision ID: 467799425f81
+Revises: 2559972ee18a
+Create Date: 2026-10-14 10:42:41.361970
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '467799425f81'
+down_revision: Union[str, Sequence[str], None] = '2559972ee18a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_al_created_day_utc',
+        'activity_logs',
+        [sa.text("date_trunc('day', timezone('UTC', created_at))")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_al_created_day_utc', table_name='activity_logs')
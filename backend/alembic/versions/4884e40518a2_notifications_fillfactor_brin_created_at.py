@@ -0,0 +1,41 @@
+"""notifications fillfactor and brin index on created_at
+
+Revision ID: 4884e40518a2
+Revises: 8e37934f99aa
+Create Date: 2026-10-14 10:34:23.669201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4884e40518a2'
+down_revision: Union[str, Sequence[str], None] = '8e37934f99aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Leave free space in each page so is_read/read_at updates can stay on the same page
+    op.execute("ALTER TABLE notifications SET (fillfactor = 85)")
+    # Inserts arrive in created_at order; BRIN serves age-based scans (cleanup) far smaller than a btree.
+    # Per-user reads use ix_notifications_user_created / ix_notifications_user_unread.
+    op.drop_index(op.f('ix_notifications_created_at'), table_name='notifications')
+    op.create_index(
+        'ix_notifications_created_brin',
+        'notifications',
+        ['created_at'],
+        unique=False,
+        postgresql_using='brin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_created_brin', table_name='notifications')
+    op.create_index(op.f('ix_notifications_created_at'), 'notifications', ['created_at'], unique=False)
+    op.execute("ALTER TABLE notifications RESET (fillfactor)")
@@ -0,0 +1,36 @@
+"""partial unique index on users.password_reset_token
+
+Revision ID: 8e37934f99aa
+Revises: 9c2901416144
+Create Date: 2026-10-14 10:29:32.606012
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e37934f99aa'
+down_revision: Union[str, Sequence[str], None] = '9c2901416144'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f('ix_users_password_reset_token'), table_name='users')
+    op.create_index(
+        'ix_users_pw_reset_token',
+        'users',
+        ['password_reset_token'],
+        unique=True,
+        postgresql_where=sa.text('password_reset_token IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_pw_reset_token', table_name='users')
+    op.create_index(op.f('ix_users_password_reset_token'), 'users', ['password_reset_token'], unique=False)
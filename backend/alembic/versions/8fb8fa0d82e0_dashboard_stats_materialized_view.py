@@ -0,0 +1,70 @@
+"""materialized view with the dashboard counters
+
+Revision ID: 8fb8fa0d82e0
+Revises: c14b02ba5f5e
+Create Date: 2026-10-14 11:02:08.105698
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8fb8fa0d82e0'
+down_revision: Union[str, Sequence[str], None] = 'c14b02ba5f5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One row of counters; the period starts are UTC midnight / Monday / 1st,
+    # evaluated when the view is refreshed
+    op.execute("""
+        CREATE MATERIALIZED VIEW dashboard_stats AS
+        WITH p AS (
+            SELECT date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS today,
+                   date_trunc('week', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS week,
+                   date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS month
+        )
+        SELECT 1 AS id, u.*, au.*, a.*, o.*, m.*, now() AS refreshed_at
+        FROM p
+        CROSS JOIN LATERAL (
+            SELECT count(*) AS total_users,
+                   count(*) FILTER (WHERE created_at >= p.today) AS new_users_today,
+                   count(*) FILTER (WHERE created_at >= p.week) AS new_users_this_week,
+                   count(*) FILTER (WHERE created_at >= p.month) AS new_users_this_month
+            FROM users
+        ) u
+        CROSS JOIN LATERAL (
+            SELECT count(DISTINCT user_id) FILTER (WHERE created_at >= p.today) AS active_users_today,
+                   count(DISTINCT user_id) FILTER (WHERE created_at >= p.week) AS active_users_this_week,
+                   count(DISTINCT user_id) FILTER (WHERE created_at >= p.month) AS active_users_this_month
+            -- The week can start in the previous month; scan from whichever is earlier
+            FROM activity_logs WHERE created_at >= least(p.week, p.month)
+        ) au
+        CROSS JOIN LATERAL (
+            SELECT count(*) AS total_activities,
+                   count(*) FILTER (WHERE created_at >= p.today) AS activities_today,
+                   count(*) FILTER (WHERE created_at >= p.week) AS activities_this_week,
+                   count(*) FILTER (WHERE created_at >= p.month) AS activities_this_month
+            FROM activity_logs
+        ) a
+        CROSS JOIN LATERAL (
+            SELECT count(*) AS total_organizations,
+                   count(*) FILTER (WHERE created_at >= p.today) AS organizations_created_today,
+                   count(*) FILTER (WHERE created_at >= p.week) AS organizations_created_this_week,
+                   count(*) FILTER (WHERE created_at >= p.month) AS organizations_created_this_month
+            FROM organizations
+        ) o
+        CROSS JOIN (SELECT count(*) AS total_memberships FROM memberships) m
+    """)
+    # REFRESH ... CONCURRENTLY requires a unique index on a plain column
+    op.create_index('ux_dashboard_stats_id', 'dashboard_stats', ['id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS dashboard_stats")
@@ -0,0 +1,41 @@
+"""brin index on activity_logs.created_at, bigint id
+
+Revision ID: 909c9035c03d
+Revises: f20d17aad65b
+Create Date: 2026-10-14 10:27:26.532212
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '909c9035c03d'
+down_revision: Union[str, Sequence[str], None] = 'f20d17aad65b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Append-only table: widen the key before the serial sequence can run out
+    op.alter_column('activity_logs', 'id', type_=sa.BigInteger(), existing_type=sa.Integer(), existing_nullable=False)
+    op.execute("ALTER SEQUENCE activity_logs_id_seq AS bigint")
+    # Rows arrive in created_at order, so a BRIN index covers time-window scans at a fraction of a btree's size
+    op.create_index(
+        'ix_activity_logs_created_at_brin',
+        'activity_logs',
+        ['created_at'],
+        unique=False,
+        postgresql_using='brin',
+        postgresql_with={'pages_per_range': 32},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_activity_logs_created_at_brin', table_name='activity_logs')
+    op.execute("ALTER SEQUENCE activity_logs_id_seq AS integer")
+    op.alter_column('activity_logs', 'id', type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=False)
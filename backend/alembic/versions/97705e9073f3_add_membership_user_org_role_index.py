@@ -0,0 +1,34 @@
+"""add memberships user/org index covering role
+
+Revision ID: 97705e9073f3
+Revises: 026fe897f66e
+Create Date: 2026-10-14 10:22:57.237854
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '97705e9073f3'
+down_revision: Union[str, Sequence[str], None] = '026fe897f66e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_memberships_user_org_role',
+        'memberships',
+        ['user_id', 'org_id'],
+        unique=False,
+        postgresql_include=['role'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_memberships_user_org_role', table_name='memberships')
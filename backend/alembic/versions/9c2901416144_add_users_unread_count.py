@@ -0,0 +1,62 @@
+"""add trigger-maintained users.unread_count
+
+Revision ID: 9c2901416144
+Revises: 909c9035c03d
+Create Date: 2026-10-14 10:29:01.664072
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2901416144'
+down_revision: Union[str, Sequence[str], None] = '909c9035c03d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        CREATE FUNCTION bump_unread() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                IF NOT NEW.is_read THEN
+                    UPDATE users SET unread_count = unread_count + 1 WHERE id = NEW.user_id;
+                END IF;
+            ELSIF TG_OP = 'UPDATE' THEN
+                IF OLD.is_read AND NOT NEW.is_read THEN
+                    UPDATE users SET unread_count = unread_count + 1 WHERE id = NEW.user_id;
+                ELSIF NOT OLD.is_read AND NEW.is_read THEN
+                    UPDATE users SET unread_count = GREATEST(unread_count - 1, 0) WHERE id = NEW.user_id;
+                END IF;
+            ELSIF TG_OP = 'DELETE' THEN
+                IF NOT OLD.is_read THEN
+                    UPDATE users SET unread_count = GREATEST(unread_count - 1, 0) WHERE id = OLD.user_id;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER t_notif_unread
+        AFTER INSERT OR DELETE OR UPDATE OF is_read ON notifications
+        FOR EACH ROW EXECUTE FUNCTION bump_unread()
+    """)
+    op.execute("""
+        UPDATE users u SET unread_count = (
+            SELECT count(*) FROM notifications n WHERE n.user_id = u.id AND NOT n.is_read
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS t_notif_unread ON notifications")
+    op.execute("DROP FUNCTION IF EXISTS bump_unread()")
+    op.drop_column('users', 'unread_count')
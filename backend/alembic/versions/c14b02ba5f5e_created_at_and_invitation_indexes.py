@@ -0,0 +1,46 @@
+"""index created_at windows and pending invitations
+
+Revision ID: c14b02ba5f5e
+Revises: 467799425f81
+Create Date: 2026-10-14 10:52:27.900357
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c14b02ba5f5e'
+down_revision: Union[str, Sequence[str], None] = '467799425f81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_users_created_at'), 'users', ['created_at'], unique=False)
+    op.create_index(op.f('ix_organizations_created_at'), 'organizations', ['created_at'], unique=False)
+    # FK column: organization deletes cascade into invitations
+    op.create_index(op.f('ix_invitations_org_id'), 'invitations', ['org_id'], unique=False)
+    op.drop_index(op.f('ix_invitations_email'), table_name='invitations')
+    op.create_index(
+        'ix_invitations_pending_email',
+        'invitations',
+        ['email', 'org_id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.execute("ANALYZE users")
+    op.execute("ANALYZE organizations")
+    op.execute("ANALYZE invitations")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_invitations_pending_email', table_name='invitations')
+    op.create_index(op.f('ix_invitations_email'), 'invitations', ['email'], unique=False)
+    op.drop_index(op.f('ix_invitations_org_id'), table_name='invitations')
+    op.drop_index(op.f('ix_organizations_created_at'), table_name='organizations')
+    op.drop_index(op.f('ix_users_created_at'), table_name='users')
@@ -0,0 +1,40 @@
+"""materialized views for activity counts by action and resource type
+
+Revision ID: e10c61c5a104
+Revises: 4884e40518a2
+Create Date: 2026-10-14 10:39:23.920668
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e10c61c5a104'
+down_revision: Union[str, Sequence[str], None] = '4884e40518a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE MATERIALIZED VIEW activity_action_counts AS
+        SELECT action, count(*) AS c FROM activity_logs GROUP BY action
+    """)
+    op.execute("""
+        CREATE MATERIALIZED VIEW activity_resource_type_counts AS
+        SELECT resource_type, count(*) AS c FROM activity_logs
+        WHERE resource_type IS NOT NULL GROUP BY resource_type
+    """)
+    # REFRESH ... CONCURRENTLY requires a unique index on each view
+    op.create_index('ux_activity_action_counts_action', 'activity_action_counts', ['action'], unique=True)
+    op.create_index('ux_activity_resource_type_counts_resource_type', 'activity_resource_type_counts', ['resource_type'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS activity_resource_type_counts")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS activity_action_counts")
@@ -0,0 +1,32 @@
+"""add memberships org/role index, drop duplicate org/user index
+
+Revision ID: e2fce86d1e8b
+Revises: 0c4b7e0b75b3
+Create Date: 2026-10-14 11:24:00.575564
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2fce86d1e8b'
+down_revision: Union[str, Sequence[str], None] = '0c4b7e0b75b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Owner guards filter on (org_id, role)
+    op.create_index('ix_memberships_org_role', 'memberships', ['org_id', 'role'], unique=False)
+    # Same columns as the uq_membership_org_user constraint's unique index
+    op.drop_index('ix_memberships_org_user', table_name='memberships')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_memberships_org_user', 'memberships', ['org_id', 'user_id'], unique=False)
+    op.drop_index('ix_memberships_org_role', table_name='memberships')
@@ -0,0 +1,40 @@
+"""replace notifications is_read index with partial unread index
+
+Revision ID: f20d17aad65b
+Revises: 187c0a4118a3
+Create Date: 2026-10-14 10:25:10.190929
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f20d17aad65b'
+down_revision: Union[str, Sequence[str], None] = '187c0a4118a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f('ix_notifications_is_read'), table_name='notifications')
+    op.drop_index(op.f('ix_notifications_user_id'), table_name='notifications')
+    op.create_index('ix_notifications_user_created', 'notifications', ['user_id', sa.text('created_at DESC')], unique=False)
+    op.create_index(
+        'ix_notifications_user_unread',
+        'notifications',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_read = false'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_user_unread', table_name='notifications')
+    op.drop_index('ix_notifications_user_created', table_name='notifications')
+    op.create_index(op.f('ix_notifications_user_id'), 'notifications', ['user_id'], unique=False)
+    op.create_index(op.f('ix_notifications_is_read'), 'notifications', ['is_read'], unique=False)
@@ -0,0 +1,34 @@
+"""
+Application logging setup.
+
+Records from the backend.app.* loggers are put on an in-memory queue and written
+to stderr by a listener thread, so a log call on the request path never blocks
+the event loop on terminal/pipe I/O.
+"""
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: str) -> None:
+    """Install the queued stderr handler on the backend.app logger (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    app_logger = logging.getLogger("backend.app")
+    app_logger.setLevel(level)
+    app_logger.addHandler(QueueHandler(records))
+    app_logger.propagate = False
@@ -1,6 +1,35 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import orjson
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from backend.app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, echo=True, future=True)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
+# DATABASE_URL stays a plain postgresql:// URL so Alembic can keep using the sync driver;
+# the app itself talks to Postgres through asyncpg.
+ASYNC_DATABASE_URL = make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg")
+
+
+def json_dumps(value) -> str:
+    """JSON/JSONB bind encoder: orjson, keeping stdlib json's acceptance of non-str keys."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    # SQLAlchemy caches compiled SQL per engine; keep every hot statement in it
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+    # details / extra_data are (de)serialized on every insert and read
+    json_serializer=json_dumps,
+    json_deserializer=orjson.loads,
+    connect_args={
+        # asyncpg-side cache of prepared statements, per connection
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        # SQLAlchemy adapter's prepared statement cache, per connection
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    },
+)
+SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
@@ -1,41 +1,115 @@
+import hashlib
+import time
+from typing import NamedTuple, Optional
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status, Cookie
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
+from backend.app.core.config import settings
 from backend.app.db.session import SessionLocal
 from backend.app.models.user import User
+from backend.app.schema.user import UserOut
 from backend.app.utils.jwt import verify_token
 
-def get_db():
-    db = SessionLocal()
-    try:
+# In-process auth caches (per worker). Entries never outlive the token or AUTH_CACHE_TTL.
+#   token digest -> (user_id, exp)     skips JWT decoding
+#   user_id      -> column snapshot    skips the users SELECT (credentials excluded)
+#   user_id      -> UserCtx            same, for routes that only need identity
+#   user_id      -> UserOut JSON       serialized /auth/me payload
+_AUTH_CACHE_TTL = min(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, settings.AUTH_CACHE_TTL)
+_token_cache: TTLCache = TTLCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=_AUTH_CACHE_TTL)
+_user_cache: TTLCache = TTLCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=_AUTH_CACHE_TTL)
+_ctx_cache: TTLCache = TTLCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=_AUTH_CACHE_TTL)
+_out_cache: TTLCache = TTLCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=_AUTH_CACHE_TTL)
+
+
+class UserCtx(NamedTuple):
+    """Identity of the authenticated user, for routes that don't need the ORM object."""
+    id: int
+    email: str
+    name: str
+    role: str
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+# Credentials are never cached: invalidation only reaches the worker that handled the
+# write, so other workers would keep accepting an old password. Routes that need them
+# select them fresh.
+_UNCACHED_COLUMNS = frozenset({"password_hash", "password_reset_token", "password_reset_expires_at"})
+
+
+def _snapshot_user(user: User) -> dict:
+    return {
+        attr.key: getattr(user, attr.key)
+        for attr in User.__mapper__.column_attrs
+        if attr.key not in _UNCACHED_COLUMNS
+    }
+
+
+def _restore_user(db: AsyncSession, snapshot: dict) -> User:
+    """Rebuild a cached user as a persistent instance of this request's session (no SQL)."""
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop the cached row for a user. Call after committing changes to that user."""
+    _user_cache.pop(user_id, None)
+    _ctx_cache.pop(user_id, None)
+    _out_cache.pop(user_id, None)
+
+
+def user_out_json(user: User) -> bytes:
+    """UserOut JSON for a user, validated and encoded once per cache lifetime."""
+    body = _out_cache.get(user.id)
+    if body is None:
+        body = UserOut.model_validate(user).model_dump_json().encode()
+        _out_cache[user.id] = body
+    return body
+
+
+def forget_token(token: Optional[str]) -> None:
+    """Drop a token from the auth cache (e.g. on logout)."""
+    if token:
+        _token_cache.pop(_token_digest(token), None)
+
+
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def get_current_user(
-    access_token: str = Cookie(None, alias="access_token"),
-    db: Session = Depends(get_db)
-) -> User:
+def _resolve_user_id(access_token: Optional[str]) -> int:
     if not access_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated"
         )
-    
+
+    digest = _token_digest(access_token)
+    cached = _token_cache.get(digest)
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+
     payload = verify_token(access_token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token"
         )
-    
+
     user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload"
         )
-    
+
     # Convert user_id to int (sub is stored as string in JWT)
     try:
         user_id = int(user_id)
@@ -44,13 +118,57 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID in token"
         )
-    
-    user = db.execute(select(User).where(User.id == user_id)).scalars().first()
+
+    _token_cache[digest] = (user_id, payload.get("exp", 0))
+    return user_id
+
+
+async def get_current_user(
+    access_token: str = Cookie(None, alias="access_token"),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    user_id = _resolve_user_id(access_token)
+
+    snapshot = _user_cache.get(user_id)
+    if snapshot is not None:
+        return _restore_user(db, snapshot)
+
+    # Primary-key get: served from the session's identity map if this request already loaded the user
+    user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
-    
+
+    _user_cache[user_id] = _snapshot_user(user)
     return user
 
+
+async def get_current_user_ctx(
+    access_token: str = Cookie(None, alias="access_token"),
+    db: AsyncSession = Depends(get_db)
+) -> UserCtx:
+    """Like get_current_user, but only loads the identity columns and returns a UserCtx."""
+    user_id = _resolve_user_id(access_token)
+
+    ctx = _ctx_cache.get(user_id)
+    if ctx is not None:
+        return ctx
+
+    snapshot = _user_cache.get(user_id)
+    if snapshot is not None:
+        ctx = UserCtx(*(snapshot[field] for field in UserCtx._fields))
+    else:
+        row = (await db.execute(
+            select(User.id, User.email, User.name, User.role).where(User.id == user_id)
+        )).first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        ctx = UserCtx(*row)
+
+    _ctx_cache[user_id] = ctx
+    return ctx
@@ -1,12 +1,27 @@
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Set, Tuple, Callable
-from backend.app.deps.auth import get_current_user, get_db
-from backend.app.models.user import User
+from typing import NamedTuple, Set, Tuple, Callable
+from cachetools import TTLCache
+from backend.app.deps.auth import get_current_user_ctx, UserCtx, get_db
 from backend.app.models.organization import Membership
 
 
+class MembershipRole(NamedTuple):
+    """The slice of a membership that role checks need (served by ix_memberships_user_org_role)."""
+    id: int
+    role: str
+
+
+# (user_id, org_id) -> MembershipRole. Only positive lookups are cached.
+_membership_cache: TTLCache = TTLCache(maxsize=50_000, ttl=60)
+
+
+def invalidate_membership_cache(user_id: int, org_id: int) -> None:
+    """Drop the cached role for a membership. Call after changing or removing it."""
+    _membership_cache.pop((user_id, org_id), None)
+
+
 def require_role(allowed_roles: Set[str] = None):
     """
     Factory function that returns a dependency ensuring the current user has one of the allowed roles.
@@ -15,18 +30,24 @@ def require_role(allowed_roles: Set[str] = None):
     if allowed_roles is None:
         allowed_roles = {"owner", "admin", "member"}
     
-    def dependency(
+    async def dependency(
         org_id: int,
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
-    ) -> Tuple[User, Membership]:
-        # Get membership
-        membership = db.execute(
-            select(Membership).where(
-                Membership.org_id == org_id,
-                Membership.user_id == current_user.id
-            )
-        ).scalars().first()
+        current_user: UserCtx = Depends(get_current_user_ctx),
+        db: AsyncSession = Depends(get_db)
+    ) -> Tuple[UserCtx, MembershipRole]:
+        key = (current_user.id, org_id)
+        membership = _membership_cache.get(key)
+        if membership is None:
+            # Index-only scan: only id and role are needed
+            row = (await db.execute(
+                select(Membership.id, Membership.role).where(
+                    Membership.user_id == current_user.id,
+                    Membership.org_id == org_id
+                )
+            )).first()
+            if row is not None:
+                membership = MembershipRole(id=row.id, role=row.role)
+                _membership_cache[key] = membership
         
         if not membership:
             raise HTTPException(
@@ -43,6 +64,3 @@ def require_role(allowed_roles: Set[str] = None):
         return (current_user, membership)
     
     return dependency
-
-
-
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, func
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, ForeignKey, Index, func, table, column, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from backend.app.db.base import Base
 
@@ -6,18 +7,50 @@ from backend.app.db.base import Base
 class ActivityLog(Base):
     __tablename__ = "activity_logs"
     
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
-    action = Column(String(100), nullable=False, index=True)  # e.g., "user.login", "org.create", "member.add"
-    resource_type = Column(String(50), nullable=True, index=True)  # e.g., "user", "organization", "membership"
-    resource_id = Column(Integer, nullable=True, index=True)  # ID of the affected resource
-    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="SET NULL"), nullable=True, index=True)
-    details = Column(JSON, nullable=True)  # Additional context as JSON
+    id = Column(BigInteger, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    action = Column(String(100), nullable=False)  # e.g., "user.login", "org.create", "member.add"
+    resource_type = Column(String(50), nullable=True)  # e.g., "user", "organization", "membership"
+    resource_id = Column(Integer, nullable=True)  # ID of the affected resource
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="SET NULL"), nullable=True)
+    details = Column(JSONB, nullable=True)  # Additional context as JSONB
     ip_address = Column(String(45), nullable=True)  # IPv4 or IPv6
     user_agent = Column(String(500), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     user = relationship("User", backref="activity_logs")
     organization = relationship("Organization", backref="activity_logs")
+    
+    # Feeds are read as "newest first" per org or per user, ordered by (created_at, id)
+    # for keyset pagination; these composites replace the old single-column indexes.
+    # ix_al_action_created serves action-filtered feeds (?action=user.login) the same way.
+    # Time-window scans (analytics) use the BRIN index on the append-ordered created_at.
+    __table_args__ = (
+        Index("ix_al_org_created", organization_id, created_at.desc(), id.desc()),
+        Index("ix_al_user_created", user_id, created_at.desc(), id.desc()),
+        Index("ix_al_action_created", action, created_at.desc(), id.desc()),
+        Index("ix_al_resource_type", resource_type, postgresql_where=resource_type.isnot(None)),
+        Index("ix_al_resource", resource_type, resource_id, postgresql_where=resource_id.isnot(None)),
+        # Daily timelines group by the UTC day (see routers/analytics.utc_bucket)
+        Index("ix_al_created_day_utc", func.date_trunc(literal_column("'day'"), func.timezone(literal_column("'UTC'"), created_at))),
+        Index("ix_activity_logs_created_at_brin", created_at, postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+    )
+
 
+# Materialized views over activity_logs (refreshed by utils/stats_refresher.py).
+# Lightweight table() constructs: they are not part of Base.metadata, so Alembic leaves them alone.
+activity_action_counts = table("activity_action_counts", column("action", String), column("c", BigInteger))
+activity_resource_type_counts = table("activity_resource_type_counts", column("resource_type", String), column("c", BigInteger))
+# Single-row dashboard counters; column names match the UserStats/ActivityStats/OrganizationStats fields
+dashboard_stats = table(
+    "dashboard_stats",
+    *(column(name, BigInteger) for name in (
+        "total_users", "new_users_today", "new_users_this_week", "new_users_this_month",
+        "active_users_today", "active_users_this_week", "active_users_this_month",
+        "total_activities", "activities_today", "activities_this_week", "activities_this_month",
+        "total_organizations", "total_memberships",
+        "organizations_created_today", "organizations_created_this_week", "organizations_created_this_month",
+    )),
+    column("refreshed_at", DateTime(timezone=True)),
+)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.app.db.base import Base
@@ -8,7 +9,7 @@ class Notification(Base):
     __tablename__ = "notifications"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Notification content
     type = Column(String(50), nullable=False, index=True)  # invitation, activity, system, etc.
@@ -17,19 +18,29 @@ class Notification(Base):
     link_url = Column(String(500), nullable=True)  # Optional URL to navigate when clicked
     
     # Read status
-    is_read = Column(Boolean, nullable=False, default=False, index=True)
+    is_read = Column(Boolean, nullable=False, default=False)
     read_at = Column(DateTime(timezone=True), nullable=True)
     
     # Related resource (optional)
     related_resource_type = Column(String(50), nullable=True, index=True)  # invitation, organization, etc.
     related_resource_id = Column(Integer, nullable=True)
     
-    # Extra data for additional information (JSON)
-    extra_data = Column(JSON, nullable=True)
+    # Extra data for additional information (JSONB)
+    extra_data = Column(JSONB, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     user = relationship("User", backref="notifications")
+    
+    # The inbox is read newest-first per user; read-status filters (unread list,
+    # mark-all-read, is_read=true) use the (user_id, is_read, created_at) index. The table
+    # itself is created with fillfactor=85 (see migration) so read-status updates have
+    # room in their page.
+    __table_args__ = (
+        Index("ix_notifications_user_created", user_id, created_at.desc()),
+        Index("ix_notifications_user_read_created", user_id, is_read, created_at.desc()),
+        Index("ix_notifications_created_brin", created_at, postgresql_using="brin"),
+    )
 
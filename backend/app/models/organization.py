@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.orm import relationship, backref
 from backend.app.db.base import Base
 
 
@@ -8,11 +8,12 @@ class Organization(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # stats windows
     
-    # Relationships
-    memberships = relationship("Membership", back_populates="organization", cascade="all, delete-orphan")
-    invitations = relationship("Invitation", back_populates="organization", cascade="all, delete-orphan")
+    # Relationships. lazy="raise_on_sql": routes query what they need explicitly, so an
+    # accidental lazy load (an N+1 in a response loop) fails loudly instead of running SQL.
+    memberships = relationship("Membership", back_populates="organization", cascade="all, delete-orphan", lazy="raise_on_sql")
+    invitations = relationship("Invitation", back_populates="organization", cascade="all, delete-orphan", lazy="raise_on_sql")
 
 
 class Membership(Base):
@@ -26,12 +27,16 @@ class Membership(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    organization = relationship("Organization", back_populates="memberships")
-    user = relationship("User", backref="memberships")
+    organization = relationship("Organization", back_populates="memberships", lazy="raise_on_sql")
+    user = relationship("User", backref=backref("memberships", lazy="raise_on_sql"), lazy="raise_on_sql")
     
     # Unique constraint: user can only have one membership per org
     __table_args__ = (
         UniqueConstraint("org_id", "user_id", name="uq_membership_org_user"),
+        # Covering index for role checks (require_role): index-only scan on (user_id, org_id)
+        Index("ix_memberships_user_org_role", "user_id", "org_id", postgresql_include=["role"]),
+        # Owner guards ("is there another owner?") in update_member_role/remove_member
+        Index("ix_memberships_org_role", "org_id", "role"),
     )
 
 
@@ -39,14 +44,19 @@ class Invitation(Base):
     __tablename__ = "invitations"
     
     id = Column(Integer, primary_key=True, index=True)
-    org_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
-    email = Column(String(255), nullable=False, index=True)
+    org_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True)
+    email = Column(String(255), nullable=False)
     role = Column(String(20), nullable=False)  # owner, admin, member
-    token = Column(String(36), unique=True, nullable=False, index=True)  # UUID
+    token = Column(String(36), unique=True, nullable=False, index=True)  # secrets.token_urlsafe(24); older rows hold uuid4 strings
     status = Column(String(20), nullable=False, default="pending")  # pending, accepted, expired
     expires_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    organization = relationship("Organization", back_populates="invitations")
+    organization = relationship("Organization", back_populates="invitations", lazy="raise_on_sql")
+    
+    # Invitations are only ever looked up by email while pending (duplicate check, "my invitations")
+    __table_args__ = (
+        Index("ix_invitations_pending_email", email, org_id, postgresql_where=status == "pending"),
+    )
 
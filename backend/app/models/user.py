@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func
+from sqlalchemy import Column, Integer, String, DateTime, Index, func
 from backend.app.db.base import Base
 
 class User(Base):
@@ -8,11 +8,25 @@ class User(Base):
     name = Column(String(255), nullable=False)
     password_hash = Column(String(255), nullable=False)
     role = Column(String(50), nullable=False, default="member")
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # growth/stats windows
     
     # Password reset fields
-    password_reset_token = Column(String(255), nullable=True, index=True)
+    password_reset_token = Column(String(255), nullable=True)
     password_reset_expires_at = Column(DateTime(timezone=True), nullable=True)
     
     # Avatar field
     avatar_url = Column(String(500), nullable=True)
+    
+    # Unread notification count, maintained by the t_notif_unread trigger on notifications.
+    # Read it with a fresh SELECT: cached/ORM copies of the user go stale as notifications change.
+    unread_count = Column(Integer, nullable=False, server_default="0")
+    
+    # Only users with a pending reset carry a token, so index just those rows
+    __table_args__ = (
+        Index(
+            "ix_users_pw_reset_token",
+            password_reset_token,
+            unique=True,
+            postgresql_where=password_reset_token.isnot(None),
+        ),
+    )
@@ -1,65 +1,149 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, or_, func, desc
+from fastapi.responses import ORJSONResponse
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_, or_, func, desc, tuple_, exists, lambda_stmt, null
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 from typing import Optional, List
 from datetime import datetime, timedelta
 
-from backend.app.deps.auth import get_current_user, get_db
+from backend.app.deps.auth import get_current_user_ctx, UserCtx, get_db
 from backend.app.deps.rbac import require_role
 from backend.app.models.user import User
 from backend.app.models.activity import ActivityLog
-from backend.app.models.organization import Membership
+from backend.app.models.organization import Membership, Organization
 from backend.app.schema.activity import ActivityLogOut, ActivityLogList
+from backend.app.utils.pagination import encode_cursor, decode_cursor, check_offset
 
 router = APIRouter()
 
 
+# ActivityLogOut fields that map 1:1 onto activity_logs columns
+_LOG_COLS = tuple(
+    name for name in ActivityLogOut.model_fields if name in ActivityLog.__table__.columns
+)
+# Feeds select plain columns (no ORM instances); names come from many-to-one outer
+# joins, which never multiply rows, so ORDER BY ... LIMIT still applies per log.
+_LOG_SELECT = tuple(ActivityLog.__table__.c[name] for name in _LOG_COLS)
+_LOG_NAMES = (User.name.label("user_name"), Organization.name.label("organization_name"))
+# Feeds that skip the joins select NULL names, so every feed row has the same shape
+_NO_NAMES = (null().label("user_name"), null().label("organization_name"))
+
+
+def _log_query(with_names: bool = True):
+    """Base SELECT for log feeds, with or without the related user/org names."""
+    if not with_names:
+        return select(*_LOG_SELECT, *_NO_NAMES)
+    return (
+        select(*_LOG_SELECT, *_LOG_NAMES)
+        .outerjoin(User, User.id == ActivityLog.user_id)
+        .outerjoin(Organization, Organization.id == ActivityLog.organization_id)
+    )
+
+
+async def _is_member(db: AsyncSession, user_id: int, org_id: int) -> bool:
+    """Membership probe via EXISTS: no row is materialized, the scan stops at the first match."""
+    # lambda_stmt: built and cache-keyed once per call site; later calls only bind the ids
+    return (await db.execute(lambda_stmt(
+        lambda: select(exists().where(Membership.user_id == user_id, Membership.org_id == org_id))
+    ))).scalar()
+
+
+async def _fetch_page(db: AsyncSession, query, page: int, page_size: int, cursor: Optional[str]):
+    """
+    Run a log query newest-first and return (rows, next_cursor).
+    With a cursor the page is found by keyset seek on (created_at, id) instead of OFFSET.
+    query may be a plain select or a lambda_stmt; lambda statements stay lambdas.
+    """
+    def extend(fn):
+        return query + fn if isinstance(query, StatementLambdaElement) else fn(query)
+    
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        query = extend(lambda s: s.where(tuple_(ActivityLog.created_at, ActivityLog.id) < tuple_(cursor_ts, cursor_id)))
+    else:
+        offset = (page - 1) * page_size
+        query = extend(lambda s: s.offset(offset))
+    
+    # Fetch one extra row to learn whether another page exists
+    limit = page_size + 1
+    query = extend(lambda s: s.order_by(desc(ActivityLog.created_at), desc(ActivityLog.id)).limit(limit))
+    logs = (await db.execute(query)).all()
+    
+    next_cursor = None
+    if len(logs) > page_size:
+        logs = logs[:page_size]
+        next_cursor = encode_cursor(logs[-1].created_at, logs[-1].id)
+    return logs, next_cursor
+
+
+class _LogListResponse(ORJSONResponse):
+    """ORJSONResponse that writes UTC datetimes with a Z suffix, as Pydantic does."""
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def _log_list(rows, total: Optional[int], page: int, page_size: int, next_cursor: Optional[str]) -> ORJSONResponse:
+    """
+    Serialize a feed page straight from its rows with orjson, bypassing response_model
+    (kept on the routes for OpenAPI). Same JSON shape as ActivityLogList.
+    """
+    return _LogListResponse({
+        "logs": [dict(row._mapping) for row in rows],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "has_next": next_cursor is not None,
+        "next_cursor": next_cursor,
+    })
+
+
+def _log_out(row) -> ActivityLogOut:
+    """
+    Build the response schema from a _log_query row without running validators
+    (model_construct). Rows come straight from our own schema, so validation would
+    only re-check them.
+    """
+    return ActivityLogOut.model_construct(**row._mapping)
+
+
 @router.get("/activity/logs", response_model=ActivityLogList)
-def get_activity_logs(
+async def get_activity_logs(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces page)"),
+    include_total: bool = Query(False, description="Also count all matching logs (extra COUNT query)"),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     action: Optional[str] = Query(None, description="Filter by action type"),
     resource_type: Optional[str] = Query(None, description="Filter by resource type"),
     organization_id: Optional[int] = Query(None, description="Filter by organization ID"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get activity logs with filtering and pagination.
     Users can only see logs for organizations they belong to, or their own logs.
     """
+    if cursor is None:
+        check_offset(page, page_size)
+    
     # Build query
-    query = select(ActivityLog)
+    query = _log_query()
     conditions = []
     
     # If not filtering by organization, only show user's own logs or org logs they belong to
     if organization_id is None:
-        # Get user's organization IDs
-        user_orgs = db.execute(
-            select(Membership.org_id).where(Membership.user_id == current_user.id)
-        ).scalars().all()
-        
-        if user_orgs:
-            conditions.append(
-                or_(
-                    ActivityLog.user_id == current_user.id,  # User's own actions
-                    ActivityLog.organization_id.in_(user_orgs)  # Actions in user's orgs
-                )
+        # Membership is resolved inside the same statement; no separate round-trip
+        user_orgs = select(Membership.org_id).where(Membership.user_id == current_user.id)
+        conditions.append(
+            or_(
+                ActivityLog.user_id == current_user.id,  # User's own actions
+                ActivityLog.organization_id.in_(user_orgs)  # Actions in user's orgs
             )
-        else:
-            # User has no orgs, only show their own logs
-            conditions.append(ActivityLog.user_id == current_user.id)
+        )
     else:
         # Filtering by specific organization - check membership
-        membership = db.execute(
-            select(Membership).where(
-                Membership.org_id == organization_id,
-                Membership.user_id == current_user.id
-            )
-        ).scalars().first()
-        
-        if not membership:
+        if not await _is_member(db, current_user.id, organization_id):
             raise HTTPException(
                 status_code=403,
                 detail="You are not a member of this organization"
@@ -81,167 +165,113 @@ def get_activity_logs(
         query = query.where(and_(*conditions))
     
     # Get total count
-    count_query = select(func.count()).select_from(ActivityLog)
-    if conditions:
-        count_query = count_query.where(and_(*conditions))
-    total = db.execute(count_query).scalar() or 0
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(ActivityLog)
+        if conditions:
+            count_query = count_query.where(and_(*conditions))
+        total = (await db.execute(count_query)).scalar() or 0
     
     # Apply pagination and ordering
-    query = query.order_by(desc(ActivityLog.created_at))
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    
-    # Execute query
-    logs = db.execute(query).scalars().all()
-    
-    # Load related data
-    log_dicts = []
-    for log in logs:
-        log_dict = ActivityLogOut.model_validate(log)
-        
-        # Add user name if available
-        if log.user_id:
-            user = db.get(User, log.user_id)
-            if user:
-                log_dict.user_name = user.name
-        
-        # Add organization name if available
-        if log.organization_id:
-            from backend.app.models.organization import Organization
-            org = db.get(Organization, log.organization_id)
-            if org:
-                log_dict.organization_name = org.name
-        
-        log_dicts.append(log_dict)
+    logs, next_cursor = await _fetch_page(db, query, page, page_size, cursor)
     
-    return ActivityLogList(
-        logs=log_dicts,
-        total=total,
-        page=page,
-        page_size=page_size
-    )
+    return _log_list(logs, total, page, page_size, next_cursor)
 
 
 @router.get("/activity/logs/me", response_model=ActivityLogList)
-def get_my_activity_logs(
+async def get_my_activity_logs(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces page)"),
+    include_total: bool = Query(False, description="Also count all matching logs (extra COUNT query)"),
     action: Optional[str] = Query(None, description="Filter by action type"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get activity logs for the current user only."""
-    query = select(ActivityLog).where(ActivityLog.user_id == current_user.id)
+    if cursor is None:
+        check_offset(page, page_size)
+    
+    query = _log_query(with_names=False).where(ActivityLog.user_id == current_user.id)
     
     if action is not None:
         query = query.where(ActivityLog.action == action)
     
     # Get total count
-    count_query = select(func.count()).select_from(ActivityLog).where(
-        ActivityLog.user_id == current_user.id
-    )
-    if action is not None:
-        count_query = count_query.where(ActivityLog.action == action)
-    total = db.execute(count_query).scalar() or 0
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(ActivityLog).where(
+            ActivityLog.user_id == current_user.id
+        )
+        if action is not None:
+            count_query = count_query.where(ActivityLog.action == action)
+        total = (await db.execute(count_query)).scalar() or 0
     
     # Apply pagination and ordering
-    query = query.order_by(desc(ActivityLog.created_at))
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    logs, next_cursor = await _fetch_page(db, query, page, page_size, cursor)
     
-    logs = db.execute(query).scalars().all()
-    
-    log_dicts = [ActivityLogOut.model_validate(log) for log in logs]
-    
-    return ActivityLogList(
-        logs=log_dicts,
-        total=total,
-        page=page,
-        page_size=page_size
-    )
+    return _log_list(logs, total, page, page_size, next_cursor)
 
 
 @router.get("/activity/logs/org/{org_id}", response_model=ActivityLogList)
-def get_organization_activity_logs(
+async def get_organization_activity_logs(
     org_id: int,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces page)"),
+    include_total: bool = Query(False, description="Also count all matching logs (extra COUNT query)"),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     action: Optional[str] = Query(None, description="Filter by action type"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get activity logs for a specific organization. Requires membership."""
-    # Check membership
-    membership = db.execute(
-        select(Membership).where(
-            Membership.org_id == org_id,
-            Membership.user_id == current_user.id
-        )
-    ).scalars().first()
+    if cursor is None:
+        check_offset(page, page_size)
     
-    if not membership:
+    # Check membership
+    if not await _is_member(db, current_user.id, org_id):
         raise HTTPException(
             status_code=403,
             detail="You are not a member of this organization"
         )
     
-    # Build query
-    query = select(ActivityLog).where(ActivityLog.organization_id == org_id)
+    # Build query. The hottest feed, so it is a lambda_stmt: SQLAlchemy skips rebuilding
+    # and cache-keying the statement on repeat calls; only the bound values change.
+    query = lambda_stmt(lambda: _log_query().where(ActivityLog.organization_id == org_id))
     
     if user_id is not None:
-        query = query.where(ActivityLog.user_id == user_id)
+        query += lambda s: s.where(ActivityLog.user_id == user_id)
     
     if action is not None:
-        query = query.where(ActivityLog.action == action)
+        query += lambda s: s.where(ActivityLog.action == action)
     
     # Get total count
-    count_query = select(func.count()).select_from(ActivityLog).where(
-        ActivityLog.organization_id == org_id
-    )
-    if user_id is not None:
-        count_query = count_query.where(ActivityLog.user_id == user_id)
-    if action is not None:
-        count_query = count_query.where(ActivityLog.action == action)
-    total = db.execute(count_query).scalar() or 0
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(ActivityLog).where(
+            ActivityLog.organization_id == org_id
+        )
+        if user_id is not None:
+            count_query = count_query.where(ActivityLog.user_id == user_id)
+        if action is not None:
+            count_query = count_query.where(ActivityLog.action == action)
+        total = (await db.execute(count_query)).scalar() or 0
     
     # Apply pagination and ordering
-    query = query.order_by(desc(ActivityLog.created_at))
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    logs, next_cursor = await _fetch_page(db, query, page, page_size, cursor)
     
-    logs = db.execute(query).scalars().all()
-    
-    # Load related data
-    log_dicts = []
-    for log in logs:
-        log_dict = ActivityLogOut.model_validate(log)
-        
-        if log.user_id:
-            user = db.get(User, log.user_id)
-            if user:
-                log_dict.user_name = user.name
-        
-        from backend.app.models.organization import Organization
-        org = db.get(Organization, org_id)
-        if org:
-            log_dict.organization_name = org.name
-        
-        log_dicts.append(log_dict)
-    
-    return ActivityLogList(
-        logs=log_dicts,
-        total=total,
-        page=page,
-        page_size=page_size
-    )
+    return _log_list(logs, total, page, page_size, next_cursor)
 
 
 @router.get("/activity/logs/{log_id}", response_model=ActivityLogOut)
-def get_activity_log(
+async def get_activity_log(
     log_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific activity log by ID. User must have access to it."""
-    log = db.get(ActivityLog, log_id)
+    log = (await db.execute(_log_query().where(ActivityLog.id == log_id))).first()
     
     if not log:
         raise HTTPException(status_code=404, detail="Activity log not found")
@@ -252,14 +282,7 @@ def get_activity_log(
     if log.user_id == current_user.id:
         has_access = True
     elif log.organization_id:
-        membership = db.execute(
-            select(Membership).where(
-                Membership.org_id == log.organization_id,
-                Membership.user_id == current_user.id
-            )
-        ).scalars().first()
-        if membership:
-            has_access = True
+        has_access = await _is_member(db, current_user.id, log.organization_id)
     
     if not has_access:
         raise HTTPException(
@@ -267,20 +290,4 @@ def get_activity_log(
             detail="You do not have access to this activity log"
         )
     
-    log_dict = ActivityLogOut.model_validate(log)
-    
-    # Add user name if available
-    if log.user_id:
-        user = db.get(User, log.user_id)
-        if user:
-            log_dict.user_name = user.name
-    
-    # Add organization name if available
-    if log.organization_id:
-        from backend.app.models.organization import Organization
-        org = db.get(Organization, log.organization_id)
-        if org:
-            log_dict.organization_name = org.name
-    
-    return log_dict
-
+    return _log_out(log)
@@ -1,18 +1,23 @@
 """
 Analytics API endpoints for dashboard statistics and metrics.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, and_, or_, case
-from sqlalchemy import Date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, or_, case, literal_column, literal, union_all, column, bindparam
+from sqlalchemy import DateTime
 from sqlalchemy.sql import cast
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Awaitable, Callable, List, Literal
+import asyncio
+import time
+from collections import defaultdict
+from cachetools import TTLCache
 
-from backend.app.deps.auth import get_current_user, get_db
+from backend.app.core.config import settings
+from backend.app.db.session import SessionLocal
+from backend.app.deps.auth import get_current_user_ctx, UserCtx, get_db
 from backend.app.models.user import User
-from backend.app.models.organization import Organization, Membership
-from backend.app.models.activity import ActivityLog
+from backend.app.models.activity import ActivityLog, activity_action_counts, activity_resource_type_counts, dashboard_stats
 from backend.app.schema.analytics import (
     UserStats, ActivityStats, OrganizationStats,
     DashboardStats, ActivityTimeSeries, TimeSeriesDataPoint,
@@ -21,6 +26,26 @@ from backend.app.schema.analytics import (
 
 router = APIRouter()
 
+# Stats are global (not per user/org), so one entry per endpoint serves everyone.
+# Results may lag the database by up to ANALYTICS_CACHE_TTL seconds.
+_stats_cache: TTLCache = TTLCache(maxsize=16, ttl=settings.ANALYTICS_CACHE_TTL)
+# One lock per stats name: when an entry expires, only one request recomputes it
+# while concurrent requests for the same stats wait for that result
+_stats_locks = defaultdict(asyncio.Lock)
+
+
+async def _cached_stats(name: str, db: AsyncSession, compute: Callable[[AsyncSession, datetime], Awaitable]):
+    # Key on the TTL-sized time bucket so every worker rolls over at the same moment
+    key = (name, int(time.time() // settings.ANALYTICS_CACHE_TTL))
+    result = _stats_cache.get(key)
+    if result is None:
+        async with _stats_locks[name]:
+            result = _stats_cache.get(key)
+            if result is None:
+                result = await compute(db, datetime.now(timezone.utc))
+                _stats_cache[key] = result
+    return result
+
 
 def get_start_of_day(dt: datetime) -> datetime:
     """Get the start of the day for a given datetime."""
@@ -39,222 +64,190 @@ def get_start_of_month(dt: datetime) -> datetime:
     return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
 
-@router.get("/analytics/dashboard", response_model=DashboardStats)
-def get_dashboard_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+def utc_bucket(unit: str, column):
     """
-    Get comprehensive dashboard statistics including user, activity, and organization stats.
-    """
-    now = datetime.now(timezone.utc)
-    start_of_today = get_start_of_day(now)
-    start_of_week = get_start_of_week(now)
-    start_of_month = get_start_of_month(now)
-    
-    # User Statistics
-    total_users = db.execute(select(func.count(User.id))).scalar() or 0
-    new_users_today = db.execute(
-        select(func.count(User.id)).where(User.created_at >= start_of_today)
-    ).scalar() or 0
-    new_users_this_week = db.execute(
-        select(func.count(User.id)).where(User.created_at >= start_of_week)
-    ).scalar() or 0
-    new_users_this_month = db.execute(
-        select(func.count(User.id)).where(User.created_at >= start_of_month)
-    ).scalar() or 0
+    date_trunc(unit, column AT TIME ZONE 'UTC'), independent of the session timezone.
     
-    # Active users (users who have activity logs)
-    active_users_today = db.execute(
-        select(func.count(func.distinct(ActivityLog.user_id)))
-        .where(ActivityLog.created_at >= start_of_today)
-    ).scalar() or 0
-    active_users_this_week = db.execute(
-        select(func.count(func.distinct(ActivityLog.user_id)))
-        .where(ActivityLog.created_at >= start_of_week)
-    ).scalar() or 0
-    active_users_this_month = db.execute(
-        select(func.count(func.distinct(ActivityLog.user_id)))
-        .where(ActivityLog.created_at >= start_of_month)
-    ).scalar() or 0
-    
-    user_stats = UserStats(
-        total_users=total_users,
-        new_users_today=new_users_today,
-        new_users_this_week=new_users_this_week,
-        new_users_this_month=new_users_this_month,
-        active_users_today=active_users_today,
-        active_users_this_week=active_users_this_week,
-        active_users_this_month=active_users_this_month
-    )
-    
-    # Activity Statistics
-    total_activities = db.execute(select(func.count(ActivityLog.id))).scalar() or 0
-    activities_today = db.execute(
-        select(func.count(ActivityLog.id)).where(ActivityLog.created_at >= start_of_today)
-    ).scalar() or 0
-    activities_this_week = db.execute(
-        select(func.count(ActivityLog.id)).where(ActivityLog.created_at >= start_of_week)
-    ).scalar() or 0
-    activities_this_month = db.execute(
-        select(func.count(ActivityLog.id)).where(ActivityLog.created_at >= start_of_month)
-    ).scalar() or 0
-    
-    # Activities by action
-    activities_by_action_raw = db.execute(
-        select(ActivityLog.action, func.count(ActivityLog.id))
-        .group_by(ActivityLog.action)
-    ).all()
-    activities_by_action = {action: count for action, count in activities_by_action_raw}
+    Units are inlined as constants (not bind parameters) so the day bucket matches
+    the ix_al_created_day_utc expression index.
+    """
+    return func.date_trunc(literal_column(f"'{unit}'"), func.timezone(literal_column("'UTC'"), column))
+
+
+def _utc_day_start(dt: datetime) -> datetime:
+    """Naive UTC midnight of dt, comparable with utc_bucket('day', ...)."""
+    return get_start_of_day(dt.astimezone(timezone.utc)).replace(tzinfo=None)
+
+
+# Counters come from the dashboard_stats materialized view (lag up to
+# ANALYTICS_MV_REFRESH_INTERVAL), so each section is a one-row read
+_USER_STATS = select(*(dashboard_stats.c[name] for name in UserStats.model_fields))
+_ACTIVITY_COUNTS = select(*(
+    dashboard_stats.c[name] for name in ActivityStats.model_fields if name in dashboard_stats.c
+))
+_ORGANIZATION_STATS = select(*(
+    dashboard_stats.c[name] for name in OrganizationStats.model_fields if name in dashboard_stats.c
+))
+# Counts by action / resource type come from their own materialized views; both
+# views are read in one UNION ALL round-trip, tagged by source
+_ACTIVITY_BREAKDOWN = union_all(
+    select(literal("action").label("kind"), activity_action_counts.c.action.label("key"), activity_action_counts.c.c),
+    select(literal("resource_type"), activity_resource_type_counts.c.resource_type, activity_resource_type_counts.c.c),
+)
+
+_timeline_day = utc_bucket("day", ActivityLog.created_at)
+_ACTIVITY_TIMELINE = (
+    select(_timeline_day.label('date'), func.count(ActivityLog.id).label('count'))
+    .where(_timeline_day >= bindparam("since", type_=DateTime()))
+    .group_by(_timeline_day)
+    .order_by(_timeline_day)
+)
+
+
+async def _user_stats(db: AsyncSession, now: datetime) -> UserStats:
+    """Signups and active users per period."""
+    row = (await db.execute(_USER_STATS)).one()
+    return UserStats(**row._mapping)
+
+
+async def _activity_stats(db: AsyncSession, now: datetime) -> ActivityStats:
+    """Activity counts per period plus the per-action/resource-type breakdowns."""
+    counts = (await db.execute(_ACTIVITY_COUNTS)).one()
     
-    # Activities by resource type
-    activities_by_resource_type_raw = db.execute(
-        select(ActivityLog.resource_type, func.count(ActivityLog.id))
-        .where(ActivityLog.resource_type.isnot(None))
-        .group_by(ActivityLog.resource_type)
-    ).all()
-    activities_by_resource_type = {rtype: count for rtype, count in activities_by_resource_type_raw}
+    breakdown = (await db.execute(_ACTIVITY_BREAKDOWN)).all()
+    activities_by_action = {key: c for kind, key, c in breakdown if kind == "action"}
+    activities_by_resource_type = {key: c for kind, key, c in breakdown if kind == "resource_type"}
     
-    activity_stats = ActivityStats(
-        total_activities=total_activities,
-        activities_today=activities_today,
-        activities_this_week=activities_this_week,
-        activities_this_month=activities_this_month,
+    return ActivityStats(
+        **counts._mapping,
         activities_by_action=activities_by_action,
         activities_by_resource_type=activities_by_resource_type
     )
-    
-    # Organization Statistics
-    total_organizations = db.execute(select(func.count(Organization.id))).scalar() or 0
-    total_memberships = db.execute(select(func.count(Membership.id))).scalar() or 0
+
+
+async def _organization_stats(db: AsyncSession, now: datetime) -> OrganizationStats:
+    """Organization and membership counts."""
+    row = (await db.execute(_ORGANIZATION_STATS)).one()
+    total_organizations, total_memberships = row.total_organizations, row.total_memberships
     average_members_per_org = (
         total_memberships / total_organizations if total_organizations > 0 else 0.0
     )
     
-    organizations_created_today = db.execute(
-        select(func.count(Organization.id))
-        .where(Organization.created_at >= start_of_today)
-    ).scalar() or 0
-    organizations_created_this_week = db.execute(
-        select(func.count(Organization.id))
-        .where(Organization.created_at >= start_of_week)
-    ).scalar() or 0
-    organizations_created_this_month = db.execute(
-        select(func.count(Organization.id))
-        .where(Organization.created_at >= start_of_month)
-    ).scalar() or 0
-    
-    organization_stats = OrganizationStats(
-        total_organizations=total_organizations,
-        total_memberships=total_memberships,
-        average_members_per_org=round(average_members_per_org, 2),
-        organizations_created_today=organizations_created_today,
-        organizations_created_this_week=organizations_created_this_week,
-        organizations_created_this_month=organizations_created_this_month
+    return OrganizationStats(
+        **row._mapping,
+        average_members_per_org=round(average_members_per_org, 2)
     )
-    
-    # Activity Timeline (last 30 days)
-    thirty_days_ago = now - timedelta(days=30)
-    timeline_data = db.execute(
-        select(
-            cast(ActivityLog.created_at, Date).label('date'),
-            func.count(ActivityLog.id).label('count')
-        )
-        .where(ActivityLog.created_at >= thirty_days_ago)
-        .group_by(cast(ActivityLog.created_at, Date))
-        .order_by('date')
-    ).all()
+
+
+async def _activity_timeline(db: AsyncSession, now: datetime) -> ActivityTimeSeries:
+    """Daily activity counts (UTC days) over the last 30 days."""
+    timeline_data = (await db.execute(
+        _ACTIVITY_TIMELINE, {"since": _utc_day_start(now - timedelta(days=30))}
+    )).all()
     
     timeline_points = [
         TimeSeriesDataPoint(
-            date=row.date.isoformat(),
+            date=row.date.date().isoformat(),
             count=row.count
         )
         for row in timeline_data
     ]
     
-    activity_timeline = ActivityTimeSeries(
+    return ActivityTimeSeries(
         period="day",
         data=timeline_points
     )
-    
-    return DashboardStats(
-        user_stats=user_stats,
-        activity_stats=activity_stats,
-        organization_stats=organization_stats,
-        activity_timeline=activity_timeline
-    )
 
 
-@router.get("/analytics/users/stats", response_model=UserStats)
-def get_user_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+def _in_own_session(compute: Callable[[AsyncSession, datetime], Awaitable]):
+    """Wrap a stats helper so it ignores the caller's session and opens its own."""
+    # An AsyncSession runs one statement at a time, so each concurrent part needs its own
+    async def run(db: AsyncSession, now: datetime):
+        async with SessionLocal() as own_db:
+            return await compute(own_db, now)
+    return run
+
+
+DashboardSection = Literal["user_stats", "activity_stats", "organization_stats", "activity_timeline"]
+
+# Dashboard section -> (cache name, helper). Cache names are shared with the
+# per-section endpoints, so both read the same cached results.
+_DASHBOARD_SECTIONS = {
+    "user_stats": ("users", _user_stats),
+    "activity_stats": ("activities", _activity_stats),
+    "organization_stats": ("organizations", _organization_stats),
+    "activity_timeline": ("timeline", _activity_timeline),
+}
+
+
+@router.get("/analytics/dashboard", response_model=DashboardStats)
+async def get_dashboard_stats(
+    fields: Optional[List[DashboardSection]] = Query(None, description="Sections to include (default: all)"),
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get user statistics."""
-    now = datetime.now(timezone.utc)
-    start_of_today = get_start_of_day(now)
-    start_of_week = get_start_of_week(now)
-    start_of_month = get_start_of_month(now)
-    
-    total_users = db.execute(select(func.count(User.id))).scalar() or 0
-    new_users_today = db.execute(
-        select(func.count(User.id)).where(User.created_at >= start_of_today)
-    ).scalar() or 0
-    new_users_this_week = db.execute(
-        select(func.count(User.id)).where(User.created_at >= start_of_week)
-    ).scalar() or 0
-    new_users_this_month = db.execute(
-        select(func.count(User.id)).where(User.created_at >= start_of_month)
-    ).scalar() or 0
+    """
+    Get comprehensive dashboard statistics including user, activity, and organization stats.
     
-    active_users_today = db.execute(
-        select(func.count(func.distinct(ActivityLog.user_id)))
-        .where(ActivityLog.created_at >= start_of_today)
-    ).scalar() or 0
-    active_users_this_week = db.execute(
-        select(func.count(func.distinct(ActivityLog.user_id)))
-        .where(ActivityLog.created_at >= start_of_week)
-    ).scalar() or 0
-    active_users_this_month = db.execute(
-        select(func.count(func.distinct(ActivityLog.user_id)))
-        .where(ActivityLog.created_at >= start_of_month)
-    ).scalar() or 0
+    Only the requested sections are computed. They are independent, so they run
+    concurrently on separate pooled connections; latency is bounded by the slowest
+    section rather than their sum.
     
-    return UserStats(
-        total_users=total_users,
-        new_users_today=new_users_today,
-        new_users_this_week=new_users_this_week,
-        new_users_this_month=new_users_this_month,
-        active_users_today=active_users_today,
-        active_users_this_week=active_users_this_week,
-        active_users_this_month=active_users_this_month
-    )
+    The sections are already validated models, so the response is serialized once
+    by pydantic-core instead of being re-validated against response_model.
+    """
+    sections = list(dict.fromkeys(fields)) if fields else list(_DASHBOARD_SECTIONS)
+    results = await asyncio.gather(*(
+        _cached_stats(_DASHBOARD_SECTIONS[name][0], db, _in_own_session(_DASHBOARD_SECTIONS[name][1]))
+        for name in sections
+    ))
+    stats = DashboardStats.model_construct(**dict(zip(sections, results)))
+    return Response(content=stats.model_dump_json(), media_type="application/json")
+
 
+@router.get("/analytics/users/stats", deprecated=True, response_model=UserStats)
+async def get_user_stats(
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get user statistics. Deprecated: use /analytics/dashboard?fields=user_stats."""
+    return await _cached_stats("users", db, _user_stats)
 
 @router.get("/analytics/users/growth", response_model=UserGrowthTimeSeries)
-def get_user_growth(
+async def get_user_growth(
     days: int = Query(30, ge=1, le=365, description="Number of days to look back"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get user growth time series data."""
+    """
+    Get user growth time series data: one point per UTC day, zero-filled.
+    
+    The calendar comes from generate_series and is left-joined to the grouped
+    signups, so days without signups arrive as count 0 straight from Postgres.
+    """
     now = datetime.now(timezone.utc)
-    start_date = now - timedelta(days=days)
+    first_day = _utc_day_start(now - timedelta(days=days))
     
-    growth_data = db.execute(
-        select(
-            cast(User.created_at, Date).label('date'),
-            func.count(User.id).label('count')
-        )
-        .where(User.created_at >= start_date)
-        .group_by(cast(User.created_at, Date))
-        .order_by('date')
-    ).all()
+    day = utc_bucket("day", User.created_at)
+    signups = (
+        select(day.label('date'), func.count(User.id).label('count'))
+        .where(User.created_at >= first_day.replace(tzinfo=timezone.utc))
+        .group_by(day)
+        .subquery()
+    )
+    calendar = func.generate_series(
+        cast(first_day, DateTime), cast(_utc_day_start(now), DateTime), literal_column("interval '1 day'")
+    ).table_valued(column("day", DateTime)).render_derived(name="calendar")
+    
+    growth_data = (await db.execute(
+        select(calendar.c.day.label('date'), func.coalesce(signups.c.count, 0).label('count'))
+        .select_from(calendar.outerjoin(signups, signups.c.date == calendar.c.day))
+        .order_by(calendar.c.day)
+    )).all()
     
     data_points = [
         TimeSeriesDataPoint(
-            date=row.date.isoformat(),
+            date=row.date.date().isoformat(),
             count=row.count
         )
         for row in growth_data
@@ -266,83 +259,46 @@ def get_user_growth(
     )
 
 
-@router.get("/analytics/activities/stats", response_model=ActivityStats)
-def get_activity_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/analytics/activities/stats", deprecated=True, response_model=ActivityStats)
+async def get_activity_stats(
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get activity statistics."""
-    now = datetime.now(timezone.utc)
-    start_of_today = get_start_of_day(now)
-    start_of_week = get_start_of_week(now)
-    start_of_month = get_start_of_month(now)
-    
-    total_activities = db.execute(select(func.count(ActivityLog.id))).scalar() or 0
-    activities_today = db.execute(
-        select(func.count(ActivityLog.id)).where(ActivityLog.created_at >= start_of_today)
-    ).scalar() or 0
-    activities_this_week = db.execute(
-        select(func.count(ActivityLog.id)).where(ActivityLog.created_at >= start_of_week)
-    ).scalar() or 0
-    activities_this_month = db.execute(
-        select(func.count(ActivityLog.id)).where(ActivityLog.created_at >= start_of_month)
-    ).scalar() or 0
-    
-    activities_by_action_raw = db.execute(
-        select(ActivityLog.action, func.count(ActivityLog.id))
-        .group_by(ActivityLog.action)
-    ).all()
-    activities_by_action = {action: count for action, count in activities_by_action_raw}
-    
-    activities_by_resource_type_raw = db.execute(
-        select(ActivityLog.resource_type, func.count(ActivityLog.id))
-        .where(ActivityLog.resource_type.isnot(None))
-        .group_by(ActivityLog.resource_type)
-    ).all()
-    activities_by_resource_type = {rtype: count for rtype, count in activities_by_resource_type_raw}
-    
-    return ActivityStats(
-        total_activities=total_activities,
-        activities_today=activities_today,
-        activities_this_week=activities_this_week,
-        activities_this_month=activities_this_month,
-        activities_by_action=activities_by_action,
-        activities_by_resource_type=activities_by_resource_type
-    )
-
+    """Get activity statistics. Deprecated: use /analytics/dashboard?fields=activity_stats."""
+    return await _cached_stats("activities", db, _activity_stats)
 
 @router.get("/analytics/activities/timeline", response_model=ActivityTimeSeries)
-def get_activity_timeline(
+async def get_activity_timeline(
     days: int = Query(30, ge=1, le=365, description="Number of days to look back"),
     period: str = Query("day", regex="^(day|week|month)$", description="Aggregation period"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get activity timeline data."""
-    now = datetime.now(timezone.utc)
-    start_date = now - timedelta(days=days)
+    # Window starts on a UTC day boundary, so the bound value is stable all day
+    first_day = _utc_day_start(datetime.now(timezone.utc) - timedelta(days=days))
     
+    date_func = utc_bucket(period, ActivityLog.created_at)
     if period == "day":
-        date_func = cast(ActivityLog.created_at, Date)
-    elif period == "week":
-        # Group by week (Monday as start)
-        date_func = func.date_trunc('week', ActivityLog.created_at)
-    else:  # month
-        date_func = func.date_trunc('month', ActivityLog.created_at)
+        # Whole UTC days, filtered on the bucket so the expression index covers it
+        window = date_func >= first_day
+    else:
+        window = ActivityLog.created_at >= first_day.replace(tzinfo=timezone.utc)
     
-    timeline_data = db.execute(
+    timeline_data = (await db.execute(
         select(
             date_func.label('date'),
             func.count(ActivityLog.id).label('count')
         )
-        .where(ActivityLog.created_at >= start_date)
+        .where(window)
         .group_by(date_func)
-        .order_by('date')
-    ).all()
+        .order_by(date_func)
+    )).all()
     
+    # Buckets are naive UTC timestamps: days render as dates, weeks/months as UTC datetimes
     data_points = [
         TimeSeriesDataPoint(
-            date=str(row.date) if isinstance(row.date, datetime) else row.date.isoformat(),
+            date=row.date.date().isoformat() if period == "day" else str(row.date.replace(tzinfo=timezone.utc)),
             count=row.count
         )
         for row in timeline_data
@@ -354,41 +310,10 @@ def get_activity_timeline(
     )
 
 
-@router.get("/analytics/organizations/stats", response_model=OrganizationStats)
-def get_organization_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/analytics/organizations/stats", deprecated=True, response_model=OrganizationStats)
+async def get_organization_stats(
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get organization statistics."""
-    now = datetime.now(timezone.utc)
-    start_of_today = get_start_of_day(now)
-    start_of_week = get_start_of_week(now)
-    start_of_month = get_start_of_month(now)
-    
-    total_organizations = db.execute(select(func.count(Organization.id))).scalar() or 0
-    total_memberships = db.execute(select(func.count(Membership.id))).scalar() or 0
-    average_members_per_org = (
-        total_memberships / total_organizations if total_organizations > 0 else 0.0
-    )
-    
-    organizations_created_today = db.execute(
-        select(func.count(Organization.id))
-        .where(Organization.created_at >= start_of_today)
-    ).scalar() or 0
-    organizations_created_this_week = db.execute(
-        select(func.count(Organization.id))
-        .where(Organization.created_at >= start_of_week)
-    ).scalar() or 0
-    organizations_created_this_month = db.execute(
-        select(func.count(Organization.id))
-        .where(Organization.created_at >= start_of_month)
-    ).scalar() or 0
-    
-    return OrganizationStats(
-        total_organizations=total_organizations,
-        total_memberships=total_memberships,
-        average_members_per_org=round(average_members_per_org, 2),
-        organizations_created_today=organizations_created_today,
-        organizations_created_this_week=organizations_created_this_week,
-        organizations_created_this_month=organizations_created_this_month
-    )
+    """Get organization statistics. Deprecated: use /analytics/dashboard?fields=organization_stats."""
+    return await _cached_stats("organizations", db, _organization_stats)
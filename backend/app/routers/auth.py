@@ -1,72 +1,105 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, Cookie, BackgroundTasks, UploadFile, File, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_, func, update, exists, lambda_stmt
+from sqlalchemy.orm import load_only
 from pydantic import EmailStr
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta, timezone
-import uuid
+import secrets
+import hashlib
+import logging
+from typing import Optional
+from backend.app.db.session import SessionLocal
 from backend.app.models.user import User
 from backend.app.schema.user import UserCreate, UserLogin, UserOut, PasswordResetRequest, PasswordReset, ProfileUpdate, ChangePassword
-from backend.app.utils.password import hash_password, verify_password
+from backend.app.utils.password import hash_password_async, verify_password_async, verify_and_update_password_async, DUMMY_HASH
 from backend.app.utils.jwt import create_access_token, create_refresh_token, verify_token
-from backend.app.deps.auth import get_current_user, get_db
+from backend.app.deps.auth import get_current_user, get_db, invalidate_user_cache, forget_token, user_out_json
 from backend.app.utils.email import send_welcome_email, send_password_reset_email
 from backend.app.utils.activity import log_activity_from_request, ActivityAction, ResourceType
+from backend.app.utils.storage import store_upload, sniff_image_type, UploadTooLarge, SNIFF_BYTES, IMAGE_EXTENSIONS
+from backend.app.utils.avatar_sweeper import AVATAR_URL_PREFIX
+from backend.app.utils.rate_limit import RateLimit
 from backend.app.core.config import settings
 import os
 import shutil
 from pathlib import Path
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-@router.post("/register", response_model=UserOut, status_code=201)
-def register(
+# Each attempt costs an argon2 hash/verify (or an email), so cap them per client IP,
+# and per target email where one account can be hit from many IPs
+_login_limit = RateLimit(settings.RATE_LIMIT_LOGIN)
+_register_limit = RateLimit(settings.RATE_LIMIT_REGISTER)
+_password_reset_limit = RateLimit(settings.RATE_LIMIT_PASSWORD_RESET)
+_login_email_limit = RateLimit(settings.RATE_LIMIT_LOGIN_EMAIL)
+_password_reset_email_limit = RateLimit(settings.RATE_LIMIT_PASSWORD_RESET_EMAIL)
+
+
+def _email_ref(email: str) -> str:
+    """Short stable digest of an email, so logs can correlate requests without storing the address."""
+    return hashlib.sha256(email.lower().encode()).hexdigest()[:16]
+
+# Attributes shared by the auth cookies (HttpOnly, SameSite=lax, Path=/, Secure when
+# COOKIE_SECURE is set). Tokens are URL-safe, so the Set-Cookie lines are built
+# directly instead of going through Response.set_cookie and http.cookies per call.
+# Cookie lifetimes match the token lifetimes.
+_COOKIE_ATTRS = b"; HttpOnly; Path=/; SameSite=lax" + (b"; Secure" if settings.COOKIE_SECURE else b"")
+_ACCESS_COOKIE_MAX_AGE = b"; Max-Age=%d" % (settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+_REFRESH_COOKIE_MAX_AGE = b"; Max-Age=%d" % (settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60)
+
+
+async def _email_taken(db: AsyncSession, email: str) -> bool:
+    """Whether an account already uses this email."""
+    return await db.scalar(lambda_stmt(
+        lambda: select(exists().where(User.email == email))
+    ))
+
+
+def _set_auth_cookies(response: Response, access_token: str, refresh_token: Optional[str] = None) -> None:
+    """Append Set-Cookie headers for the access token and, if given, the refresh token."""
+    response.raw_headers.append(
+        (b"set-cookie", b"access_token=" + access_token.encode() + _ACCESS_COOKIE_MAX_AGE + _COOKIE_ATTRS)
+    )
+    if refresh_token is not None:
+        response.raw_headers.append(
+            (b"set-cookie", b"refresh_token=" + refresh_token.encode() + _REFRESH_COOKIE_MAX_AGE + _COOKIE_ATTRS)
+        )
+
+
+@router.post("/register", response_model=UserOut, status_code=201, dependencies=[Depends(_register_limit)])
+async def register(
     payload: UserCreate,
     request: Request,
     response: Response,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    existing = db.execute(select(User).where(User.email == payload.email)).scalars().first()
-    if existing:
+    # Only existence matters; ix_users_email (unique) answers this without touching the row
+    if await _email_taken(db, payload.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     u = User(
         email=str(payload.email),
         name=payload.name,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
         role="member",
     )
     try:
         db.add(u)
-        db.commit()
-        db.refresh(u)
+        # No refresh: the INSERT returns the id, and the session keeps the other
+        # attributes after commit (expire_on_commit=False), which is all UserOut needs
+        await db.commit()
         
         # Automatically sign in after registration
         access_token = create_access_token(data={"sub": str(u.id)})
         refresh_token = create_refresh_token(data={"sub": str(u.id)})
         
         # Set HttpOnly cookies
-        response.set_cookie(
-            key="access_token",
-            value=access_token,
-            httponly=True,
-            secure=False,  # Set to True in production with HTTPS
-            samesite="lax",
-            path="/",
-            max_age=30 * 60  # 30 minutes
-        )
-        response.set_cookie(
-            key="refresh_token",
-            value=refresh_token,
-            httponly=True,
-            secure=False,  # Set to True in production with HTTPS
-            samesite="lax",
-            path="/",
-            max_age=7 * 24 * 60 * 60  # 7 days
-        )
+        _set_auth_cookies(response, access_token, refresh_token)
         
         # Log activity
-        log_activity_from_request(
+        await log_activity_from_request(
             db=db,
             request=request,
             action=ActivityAction.USER_REGISTER,
@@ -76,57 +109,52 @@ def register(
             details={"email": u.email, "name": u.name}
         )
         
-        # Send welcome email in background (don't fail registration if email fails)
-        try:
-            send_welcome_email(
-                email=str(payload.email),
-                user_name=payload.name,
-                background_tasks=background_tasks
-            )
-        except Exception as e:
-            # Log error but don't fail registration
-            print(f"[WARNING] Failed to send welcome email: {str(e)}")
+        # Send welcome email in background (failures are logged by the task, never raised here)
+        send_welcome_email(
+            email=str(payload.email),
+            user_name=payload.name,
+            background_tasks=background_tasks
+        )
         
         return u
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Email already registered")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Registration failed: {e}")
 
-@router.post("/login")
-def login(payload: UserLogin, request: Request, response: Response, db: Session = Depends(get_db)):
-    u = db.execute(select(User).where(User.email == payload.email)).scalars().first()
-    if not u or not verify_password(payload.password, u.password_hash):
+@router.post("/login", dependencies=[Depends(_login_limit)])
+async def login(payload: UserLogin, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    email = payload.email
+    _login_email_limit.check(email.lower())
+    # Just the hash to verify plus the UserOut fields for the response
+    u = (await db.execute(lambda_stmt(lambda: (
+        select(User)
+        .options(load_only(User.id, User.email, User.name, User.role, User.avatar_url, User.password_hash))
+        .where(User.email == email)
+    )))).scalar_one_or_none()
+    # Always run one verify, against a dummy hash for unknown emails, so response time
+    # doesn't reveal whether the account exists
+    password_ok, new_hash = await verify_and_update_password_async(payload.password, u.password_hash if u else DUMMY_HASH)
+    if not u or not password_ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    if new_hash is not None:
+        # Legacy bcrypt (or outdated argon2 parameters): upgrade now that we know the password
+        await db.execute(update(User).where(User.id == u.id).values(password_hash=new_hash))
+        await db.commit()
+        invalidate_user_cache(u.id)
+    
     # Create tokens (sub must be a string)
     access_token = create_access_token(data={"sub": str(u.id)})
     refresh_token = create_refresh_token(data={"sub": str(u.id)})
     
     # Set HttpOnly cookies
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        secure=False,  # Set to True in production with HTTPS
-        samesite="lax",
-        path="/",
-        max_age=30 * 60  # 30 minutes
-    )
-    response.set_cookie(
-        key="refresh_token",
-        value=refresh_token,
-        httponly=True,
-        secure=False,  # Set to True in production with HTTPS
-        samesite="lax",
-        path="/",
-        max_age=7 * 24 * 60 * 60  # 7 days
-    )
+    _set_auth_cookies(response, access_token, refresh_token)
     
     # Log activity
-    log_activity_from_request(
+    await log_activity_from_request(
         db=db,
         request=request,
         action=ActivityAction.USER_LOGIN,
@@ -136,17 +164,20 @@ def login(payload: UserLogin, request: Request, response: Response, db: Session
         details={"email": u.email, "success": True}
     )
     
-    return {"message": "Login successful", "user": UserOut.model_validate(u)}
+    # Trusted ORM row: build the UserOut without another validation pass
+    user_out = UserOut.model_construct(**{name: getattr(u, name) for name in UserOut.model_fields})
+    return {"message": "Login successful", "user": user_out}
 
 @router.get("/me", response_model=UserOut)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
-    return current_user
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
+    # Polled by the dashboard: serve the cached encoding instead of validating each time
+    return Response(content=user_out_json(current_user), media_type="application/json")
 
 @router.patch("/profile", response_model=UserOut)
-def update_profile(
+async def update_profile(
     payload: ProfileUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update user profile (name and/or email).
@@ -154,10 +185,7 @@ def update_profile(
     """
     # Check if email is being updated and if it's already taken
     if payload.email and payload.email != current_user.email:
-        existing_user = db.execute(
-            select(User).where(User.email == payload.email)
-        ).scalars().first()
-        if existing_user:
+        if await _email_taken(db, payload.email):
             raise HTTPException(
                 status_code=400,
                 detail="Email already registered"
@@ -169,24 +197,25 @@ def update_profile(
         current_user.name = payload.name
     
     try:
-        db.commit()
-        db.refresh(current_user)
+        # No refresh: every UserOut field is already set on current_user (expire_on_commit=False)
+        await db.commit()
+        invalidate_user_cache(current_user.id)
         return current_user
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to update profile: {str(e)}"
         )
 
 @router.post("/refresh")
-def refresh_token_endpoint(response: Response, refresh_token_cookie: str = Cookie(None, alias="refresh_token")):
+async def refresh_token_endpoint(response: Response, refresh_token_cookie: str = Cookie(None, alias="refresh_token")):
     if not refresh_token_cookie:
         raise HTTPException(status_code=401, detail="Refresh token missing")
     
@@ -207,22 +236,15 @@ def refresh_token_endpoint(response: Response, refresh_token_cookie: str = Cooki
     # Issue new access token (sub must be a string)
     new_access_token = create_access_token(data={"sub": str(user_id)})
     
-    response.set_cookie(
-        key="access_token",
-        value=new_access_token,
-        httponly=True,
-        secure=False,
-        samesite="lax",
-        path="/",
-        max_age=30 * 60
-    )
+    _set_auth_cookies(response, new_access_token)
     
     return {"message": "Token refreshed"}
 
 @router.post("/logout")
-def logout(response: Response):
-    response.delete_cookie(key="access_token", path="/", samesite="lax")
-    response.delete_cookie(key="refresh_token", path="/", samesite="lax")
+async def logout(response: Response, access_token: str = Cookie(None, alias="access_token")):
+    forget_token(access_token)
+    response.delete_cookie(key="access_token", path="/", samesite="lax", secure=settings.COOKIE_SECURE)
+    response.delete_cookie(key="refresh_token", path="/", samesite="lax", secure=settings.COOKIE_SECURE)
     return {"message": "Logged out successfully"}
 
 
@@ -230,7 +252,7 @@ def logout(response: Response):
 async def upload_avatar(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Upload user avatar image.
@@ -238,85 +260,71 @@ async def upload_avatar(
     Accepts: JPEG, PNG, GIF, WebP
     Max size: 5MB
     """
-    # Validate file type
-    if file.content_type not in settings.ALLOWED_IMAGE_TYPES:
+    # Validate file type: both the declared type and the type sniffed from the magic bytes
+    # must be allowed; the stored file's extension comes from the sniffed type
+    head = await file.read(SNIFF_BYTES)
+    await file.seek(0)
+    image_type = sniff_image_type(head)
+    if file.content_type not in settings.ALLOWED_IMAGE_TYPES or image_type not in settings.ALLOWED_IMAGE_TYPES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file type. Allowed types: {', '.join(settings.ALLOWED_IMAGE_TYPES)}"
+            detail=f"Invalid file type. Allowed types: {', '.join(sorted(settings.ALLOWED_IMAGE_TYPES))}"
         )
     
-    # Read file content to check size
-    contents = await file.read()
-    file_size = len(contents)
+    too_large = HTTPException(
+        status_code=400,
+        detail=f"File too large. Maximum size: {settings.MAX_AVATAR_SIZE / (1024 * 1024):.1f}MB"
+    )
     
-    # Validate file size
-    if file_size > settings.MAX_AVATAR_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size: {settings.MAX_AVATAR_SIZE / (1024 * 1024):.1f}MB"
+    # Stream the upload to disk under a content-addressed name (the directory is
+    # created if needed), enforcing the size limit as it arrives
+    try:
+        stored_name = await store_upload(
+            file, Path(settings.AVATAR_DIR), IMAGE_EXTENSIONS[image_type], settings.MAX_AVATAR_SIZE
         )
+    except UploadTooLarge:
+        raise too_large
     
-    # Create upload directory if it doesn't exist
-    upload_dir = Path(settings.AVATAR_DIR)
-    upload_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = file.filename.split('.')[-1] if '.' in file.filename else 'jpg'
-    unique_filename = f"{current_user.id}_{uuid.uuid4().hex}.{file_extension}"
-    file_path = upload_dir / unique_filename
-    
-    # Delete old avatar if exists
-    if current_user.avatar_url:
-        # Extract filename from URL (format: /uploads/avatars/filename.jpg)
-        old_filename = current_user.avatar_url.split('/')[-1]
-        old_avatar_path = upload_dir / old_filename
-        if old_avatar_path.exists():
-            try:
-                old_avatar_path.unlink()
-            except Exception as e:
-                print(f"[WARNING] Failed to delete old avatar: {str(e)}")
-    
-    # Save new file
     try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(contents)
-        
         # Update user avatar URL (relative path for serving via /uploads)
-        avatar_url = f"/uploads/avatars/{unique_filename}"
-        current_user.avatar_url = avatar_url
-        db.commit()
-        db.refresh(current_user)
-        
-        return current_user
+        current_user.avatar_url = f"{AVATAR_URL_PREFIX}{stored_name}"
+        await db.commit()  # no refresh needed: avatar_url is the only column that changed
+        invalidate_user_cache(current_user.id)
     except Exception as e:
-        db.rollback()
-        # Clean up file if database update failed
-        if file_path.exists():
-            file_path.unlink()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to upload avatar: {str(e)}"
         )
+    
+    # The stored file (and the one it replaces) may be shared with other users, so
+    # nothing is deleted here; the avatar sweeper removes unreferenced files
+    
+    return current_user
 
 @router.post("/change-password")
-def change_password(
+async def change_password(
     payload: ChangePassword,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Change user password. Requires authentication and current password.
     Different from password reset - this is for authenticated users.
     """
+    # The cached user carries no hash; read the current one so a password changed or
+    # reset through another worker is honoured
+    current_hash = await db.scalar(select(User.password_hash).where(User.id == current_user.id))
+    
     # Verify current password
-    if not verify_password(payload.current_password, current_user.password_hash):
+    if not await verify_password_async(payload.current_password, current_hash):
         raise HTTPException(
             status_code=400,
             detail="Current password is incorrect"
         )
     
     # Validate new password is different from current
-    if verify_password(payload.new_password, current_user.password_hash):
+    if await verify_password_async(payload.new_password, current_hash):
         raise HTTPException(
             status_code=400,
             detail="New password must be different from current password"
@@ -331,103 +339,115 @@ def change_password(
     
     # Update password
     try:
-        current_user.password_hash = hash_password(payload.new_password)
-        db.commit()
+        current_user.password_hash = await hash_password_async(payload.new_password)
+        await db.commit()
+        invalidate_user_cache(current_user.id)
         return {"message": "Password changed successfully"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to change password: {str(e)}"
         )
 
 
-@router.post("/password-reset-request")
-def request_password_reset(
+async def _issue_reset_token(
+    user_id: int,
+    email: str,
+    user_name: str,
+    reset_token: str,
+    expires_at: datetime,
+    background_tasks: BackgroundTasks,
+) -> None:
+    """Background task: save a reset token, then send the email that carries it."""
+    async with SessionLocal() as db:
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(password_reset_token=reset_token, password_reset_expires_at=expires_at)
+        )
+        await db.commit()
+    invalidate_user_cache(user_id)
+    
+    # Queued only now, so the link never arrives before its token is stored
+    send_password_reset_email(
+        email=email,
+        user_name=user_name,
+        reset_token=reset_token,
+        background_tasks=background_tasks
+    )
+    logger.info("Password reset email queued for user %s", user_id)
+
+
+@router.post("/password-reset-request", dependencies=[Depends(_password_reset_limit)])
+async def request_password_reset(
     payload: PasswordResetRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Request a password reset. Sends an email with a reset link.
     Always returns success to prevent email enumeration attacks.
+    
+    Both branches answer right after the user lookup: storing the token and
+    sending the email happen in background tasks, so response time doesn't
+    reveal whether the account exists.
     """
     requested_email = payload.email
-    print(f"[PASSWORD RESET] Request received for email: {requested_email}")
+    _password_reset_email_limit.check(requested_email.lower())
+    logger.info("Password reset requested for email %s", _email_ref(requested_email))
     
-    user = db.execute(select(User).where(User.email == requested_email)).scalars().first()
+    user = (await db.execute(lambda_stmt(
+        lambda: select(User).options(load_only(User.id, User.email, User.name)).where(User.email == requested_email)
+    ))).scalar_one_or_none()
     
     # Always return success message (even if user doesn't exist)
     # This prevents email enumeration attacks
     if not user:
-        print(f"[PASSWORD RESET] No user found for email: {requested_email}")
+        logger.debug("Password reset: no account for email %s", _email_ref(requested_email))
         return {"message": "If that email exists, a password reset link has been sent"}
     
-    print(f"[PASSWORD RESET] User found: {user.email} (ID: {user.id})")
-    
     # Generate reset token
-    reset_token = str(uuid.uuid4())
+    reset_token = secrets.token_urlsafe(32)
     expires_at = datetime.now(timezone.utc) + timedelta(hours=1)  # Token valid for 1 hour
     
-    # Store token and expiry in user record
-    user.password_reset_token = reset_token
-    user.password_reset_expires_at = expires_at
-    db.commit()
-    
-    print(f"[PASSWORD RESET] Sending email to: {user.email} (requested: {requested_email})")
-    
-    # Send password reset email in background
-    try:
-        send_password_reset_email(
-            email=user.email,
-            user_name=user.name,
-            reset_token=reset_token,
-            background_tasks=background_tasks
-        )
-        print(f"[PASSWORD RESET] Email scheduled for: {user.email}")
-    except Exception as e:
-        # Log error but don't fail the request
-        print(f"[WARNING] Failed to send password reset email: {str(e)}")
+    # Store token and expiry in user record, then send the email (failures are logged)
+    background_tasks.add_task(
+        _issue_reset_token, user.id, user.email, user.name, reset_token, expires_at, background_tasks
+    )
     
     return {"message": "If that email exists, a password reset link has been sent"}
 
 
 @router.post("/password-reset")
-def reset_password(
+async def reset_password(
     payload: PasswordReset,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Reset password using the token from the email.
     """
-    # Find user by reset token
-    user = db.execute(
-        select(User).where(
-            User.password_reset_token == payload.token
+    # Find user by unexpired reset token; expired tokens never load a row
+    token = payload.token
+    user = (await db.execute(lambda_stmt(lambda: (
+        select(User).options(load_only(User.id, User.password_reset_token)).where(
+            User.password_reset_token == token,
+            or_(User.password_reset_expires_at.is_(None), User.password_reset_expires_at >= func.now())
         )
-    ).scalars().first()
+    )))).scalar_one_or_none()
     
-    if not user:
+    # Constant-time check of the token itself before honoring the hit
+    if not user or not secrets.compare_digest(user.password_reset_token.encode(), payload.token.encode()):
         raise HTTPException(
             status_code=400,
             detail="Invalid or expired reset token"
         )
     
-    # Check if token has expired
-    if user.password_reset_expires_at and user.password_reset_expires_at < datetime.now(timezone.utc):
-        # Clear expired token
-        user.password_reset_token = None
-        user.password_reset_expires_at = None
-        db.commit()
-        raise HTTPException(
-            status_code=400,
-            detail="Reset token has expired. Please request a new one."
-        )
-    
     # Update password
-    user.password_hash = hash_password(payload.new_password)
+    user.password_hash = await hash_password_async(payload.new_password)
     user.password_reset_token = None
     user.password_reset_expires_at = None
-    db.commit()
+    await db.commit()
+    invalidate_user_cache(user.id)
     
     return {"message": "Password reset successfully. You can now log in with your new password."}
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from backend.app.deps.auth import get_current_user_ctx, UserCtx, get_db
+from backend.app.models.user import User
+from backend.app.schema.organization import DashboardBootstrap
+from backend.app.routers.organization import my_organizations_json, pending_invitations_json
+
+router = APIRouter()
+
+
+@router.get("/dashboard/bootstrap", response_model=DashboardBootstrap)
+async def dashboard_bootstrap(
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    The current user's organizations, pending invitations and unread notification
+    count in one request, instead of three on every dashboard load.
+    
+    The two lists come from the same per-user caches as /orgs/mine and
+    /orgs/invitations/pending; the count is the counter column on users.
+    """
+    orgs = await my_organizations_json(db, current_user.id)
+    invitations = await pending_invitations_json(db, current_user.email)
+    unread_count = (await db.execute(
+        select(User.unread_count).where(User.id == current_user.id)
+    )).scalar() or 0
+    
+    # The lists are already JSON; splice them in rather than decoding and re-encoding
+    body = b'{"orgs":%s,"pending_invitations":%s,"unread_notifications_count":%d}' % (
+        orgs, invitations, unread_count
+    )
+    return Response(content=body, media_type="application/json")
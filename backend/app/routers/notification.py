@@ -1,102 +1,121 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select, desc, func, and_
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, desc, func, and_
+from typing import List, Optional
 from datetime import datetime, timezone
 
-from backend.app.deps.auth import get_current_user, get_db
+from backend.app.deps.auth import get_current_user_ctx, UserCtx, get_db
 from backend.app.models.user import User
 from backend.app.models.notification import Notification
 from backend.app.schema.notification import NotificationOut, NotificationList, MarkNotificationRead
+from backend.app.utils.pagination import check_offset
 
 router = APIRouter()
 
+_NOTIFICATION_LIST = TypeAdapter(List[NotificationOut])
+
 
 @router.get("/notifications", response_model=NotificationList)
-def get_notifications(
+async def get_notifications(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
     is_read: Optional[bool] = Query(None, description="Filter by read status"),
     type: Optional[str] = Query(None, description="Filter by notification type"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    include_total: bool = Query(False, description="Also count all matching notifications (extra COUNT query)"),
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get notifications for the current user.
     Users can only see their own notifications.
     """
-    # Build query - only current user's notifications
-    query = select(Notification).where(Notification.user_id == current_user.id)
+    check_offset(page, page_size, detail="Page too deep; narrow the filters (e.g. is_read=false)")
     
-    # Apply filters
+    # Only current user's notifications, plus the optional filters
+    predicates = [Notification.user_id == current_user.id]
     if is_read is not None:
-        query = query.where(Notification.is_read == is_read)
-    
+        predicates.append(Notification.is_read == is_read)
     if type:
-        query = query.where(Notification.type == type)
-    
-    # Get total count before pagination
-    total_query = select(func.count()).select_from(query.subquery())
-    total = db.execute(total_query).scalar() or 0
+        predicates.append(Notification.type == type)
     
-    # Get unread count
-    unread_count_query = select(func.count()).where(
-        and_(
-            Notification.user_id == current_user.id,
-            Notification.is_read == False
-        )
-    )
-    unread_count = db.execute(unread_count_query.select_from(Notification)).scalar() or 0
+    # One round trip: the page rows carry the unread counter (trigger-maintained on
+    # users) and, if asked for, the total via count(*) OVER (), which Postgres
+    # evaluates before OFFSET/LIMIT
+    unread_count_col = select(User.unread_count).where(User.id == current_user.id).scalar_subquery()
+    columns = [Notification, unread_count_col.label("unread_count")]
+    if include_total:
+        columns.append(func.count().over().label("total_count"))
     
-    # Apply pagination and ordering (newest first)
+    # Newest first; one extra row tells us whether there is a next page
     offset = (page - 1) * page_size
-    query = query.order_by(desc(Notification.created_at)).offset(offset).limit(page_size)
-    
-    # Execute query
-    notifications = db.execute(query).scalars().all()
-    
-    return NotificationList(
-        notifications=[NotificationOut.model_validate(n) for n in notifications],
+    rows = (await db.execute(
+        select(*columns)
+        .where(*predicates)
+        .order_by(desc(Notification.created_at))
+        .offset(offset)
+        .limit(page_size + 1)
+    )).all()
+    
+    total = None
+    if rows:
+        unread_count = rows[0].unread_count or 0
+        if include_total:
+            total = rows[0].total_count
+    else:
+        # Empty page: the counters still have to come from somewhere
+        fallback = [unread_count_col]
+        if include_total:
+            fallback.append(select(func.count(Notification.id)).where(*predicates).scalar_subquery())
+        counts = (await db.execute(select(*fallback))).one()
+        unread_count = counts[0] or 0
+        if include_total:
+            total = counts[1]
+    
+    has_next = len(rows) > page_size
+    notifications = [row.Notification for row in rows[:page_size]]
+    
+    # The whole page is validated in one pydantic-core call and serialized once;
+    # response_model stays for the OpenAPI schema
+    page_out = NotificationList.model_construct(
+        notifications=_NOTIFICATION_LIST.validate_python(notifications, from_attributes=True),
         total=total,
         unread_count=unread_count,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        has_next=has_next
     )
+    return Response(content=page_out.model_dump_json(), media_type="application/json")
 
 
 @router.get("/notifications/unread-count", response_model=dict)
-def get_unread_count(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_unread_count(
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get the count of unread notifications for the current user."""
-    unread_count = db.execute(
-        select(func.count()).where(
-            and_(
-                Notification.user_id == current_user.id,
-                Notification.is_read == False
-            )
-        ).select_from(Notification)
-    ).scalar() or 0
+    unread_count = (await db.execute(
+        select(User.unread_count).where(User.id == current_user.id)
+    )).scalar() or 0
     
     return {"unread_count": unread_count}
 
 
 @router.get("/notifications/{notification_id}", response_model=NotificationOut)
-def get_notification(
+async def get_notification(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific notification by ID. User must own the notification."""
-    notification = db.execute(
+    notification = (await db.execute(
         select(Notification).where(
             and_(
                 Notification.id == notification_id,
                 Notification.user_id == current_user.id
             )
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
@@ -105,118 +124,117 @@ def get_notification(
 
 
 @router.patch("/notifications/{notification_id}/read", response_model=NotificationOut)
-def mark_notification_read(
+async def mark_notification_read(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark a specific notification as read."""
-    notification = db.execute(
+    # Common case first: flip an unread notification and get the row back in one statement
+    notification = (await db.execute(
+        update(Notification)
+        .where(
+            Notification.id == notification_id,
+            Notification.user_id == current_user.id,
+            Notification.is_read == False
+        )
+        .values(is_read=True, read_at=datetime.now(timezone.utc))
+        .returning(Notification)
+    )).scalar_one_or_none()
+    
+    if notification is not None:
+        await db.commit()
+        return NotificationOut.model_validate(notification)
+    
+    # Nothing updated: either already read (return it as is) or not the user's
+    notification = (await db.execute(
         select(Notification).where(
             and_(
                 Notification.id == notification_id,
                 Notification.user_id == current_user.id
             )
         )
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
     
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    if not notification.is_read:
-        notification.is_read = True
-        notification.read_at = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(notification)
-    
     return NotificationOut.model_validate(notification)
 
 
 @router.post("/notifications/mark-read", response_model=dict)
-def mark_notifications_read(
+async def mark_notifications_read(
     data: MarkNotificationRead,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark multiple notifications as read."""
     # Verify all notifications belong to current user
-    notifications = db.execute(
-        select(Notification).where(
+    owned = (await db.execute(
+        select(func.count(Notification.id)).where(
             and_(
                 Notification.id.in_(data.notification_ids),
                 Notification.user_id == current_user.id
             )
         )
-    ).scalars().all()
+    )).scalar()
     
-    if len(notifications) != len(data.notification_ids):
+    if owned != len(data.notification_ids):
         raise HTTPException(
             status_code=400,
             detail="Some notifications not found or do not belong to current user"
         )
     
-    # Mark as read
-    now = datetime.now(timezone.utc)
-    count = 0
-    for notification in notifications:
-        if not notification.is_read:
-            notification.is_read = True
-            notification.read_at = now
-            count += 1
-    
-    db.commit()
+    # Mark as read in one UPDATE; already-read rows are left untouched
+    result = await db.execute(
+        update(Notification)
+        .where(
+            Notification.id.in_(data.notification_ids),
+            Notification.user_id == current_user.id,
+            Notification.is_read == False
+        )
+        .values(is_read=True, read_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
     
-    return {"marked_read": count, "total_requested": len(data.notification_ids)}
+    return {"marked_read": result.rowcount, "total_requested": len(data.notification_ids)}
 
 
 @router.post("/notifications/mark-all-read", response_model=dict)
-def mark_all_notifications_read(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def mark_all_notifications_read(
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark all unread notifications as read for the current user."""
-    notifications = db.execute(
-        select(Notification).where(
-            and_(
-                Notification.user_id == current_user.id,
-                Notification.is_read == False
-            )
+    result = await db.execute(
+        update(Notification)
+        .where(
+            Notification.user_id == current_user.id,
+            Notification.is_read == False
         )
-    ).scalars().all()
-    
-    now = datetime.now(timezone.utc)
-    count = 0
-    for notification in notifications:
-        notification.is_read = True
-        notification.read_at = now
-        count += 1
-    
-    db.commit()
+        .values(is_read=True, read_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
     
-    return {"marked_read": count}
+    return {"marked_read": result.rowcount}
 
 
 @router.delete("/notifications/{notification_id}", response_model=dict)
-def delete_notification(
+async def delete_notification(
     notification_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a specific notification. User must own the notification."""
-    notification = db.execute(
-        select(Notification).where(
-            and_(
-                Notification.id == notification_id,
-                Notification.user_id == current_user.id
-            )
+    result = await db.execute(
+        delete(Notification).where(
+            Notification.id == notification_id,
+            Notification.user_id == current_user.id
         )
-    ).scalar_one_or_none()
+    )
+    await db.commit()
     
-    if not notification:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    db.delete(notification)
-    db.commit()
-    
     return {"message": "Notification deleted successfully"}
-
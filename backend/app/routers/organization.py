@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path, BackgroundTasks, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, or_
+from fastapi import APIRouter, Depends, HTTPException, status, Path, BackgroundTasks, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, and_, or_, exists, func, literal, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime, timedelta, timezone
-import uuid
+import secrets
 from typing import List
+import orjson
+from cachetools import TTLCache
 
-from backend.app.deps.auth import get_current_user, get_db
-from backend.app.deps.rbac import require_role
+from backend.app.core.config import settings
+from backend.app.db.session import SessionLocal
+from backend.app.deps.auth import get_current_user_ctx, UserCtx, get_db
+from backend.app.deps.rbac import require_role, invalidate_membership_cache
 from backend.app.models.user import User
 from backend.app.models.organization import Organization, Membership, Invitation
 from backend.app.schema.organization import (
@@ -14,35 +20,69 @@ from backend.app.schema.organization import (
     MemberOut, UpdateMemberRole
 )
 from backend.app.utils.email import send_invitation_email
-from backend.app.utils.activity import log_activity_from_request, ActivityAction, ResourceType
+from backend.app.utils.activity import log_activity_from_request, log_activities_from_request, ActivityAction, ResourceType
 
 router = APIRouter()
 
+# List endpoints select exactly their schema's columns and encode the rows with orjson,
+# skipping per-row model construction (response_model stays on the routes for OpenAPI)
+_ORG_COLUMNS = (Organization.id, Organization.name, Organization.created_at)
+_INVITE_COLUMNS = (
+    Invitation.id, Invitation.org_id, Invitation.email, Invitation.role, Invitation.token,
+    Invitation.status, Invitation.expires_at, Invitation.created_at
+)
+_MEMBER_COLUMNS = (
+    Membership.id, Membership.user_id, Membership.org_id, Membership.role, Membership.created_at,
+    User.email.label("user_email"), User.name.label("user_name")
+)
+
+# Rows fetched per round trip when streaming member lists
+_MEMBER_STREAM_BATCH = 500
+
+
+def _dump_rows(rows) -> bytes:
+    """JSON array of result rows, with UTC datetimes written with a Z suffix as Pydantic does."""
+    return orjson.dumps([dict(row._mapping) for row in rows], option=orjson.OPT_UTC_Z)
+
+# In-process caches (per worker) of the two lists dashboards poll, as response JSON.
+# The mutating endpoints below drop the entries they affect; other workers catch up
+# within ORG_LIST_CACHE_TTL.
+#   user_id -> /orgs/mine
+#   email   -> /orgs/invitations/pending
+_my_orgs_cache: TTLCache = TTLCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=settings.ORG_LIST_CACHE_TTL)
+_pending_invites_cache: TTLCache = TTLCache(maxsize=settings.AUTH_CACHE_MAXSIZE, ttl=settings.ORG_LIST_CACHE_TTL)
+
 
 @router.post("/orgs", response_model=OrgOut, status_code=201)
-def create_organization(
+async def create_organization(
     payload: OrgCreate,
     request: Request,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new organization. Creator becomes owner."""
-    org = Organization(name=payload.name)
-    db.add(org)
-    db.flush()  # Get org.id
-    
-    # Create membership as owner
-    membership = Membership(
-        org_id=org.id,
-        user_id=current_user.id,
-        role="owner"
+    # One statement: insert the org, insert the owner membership from its RETURNING row,
+    # and get the server-generated id/created_at back without a refresh
+    created = (
+        insert(Organization)
+        .values(name=payload.name)
+        .returning(*_ORG_COLUMNS)
+        .cte("created")
     )
-    db.add(membership)
-    db.commit()
-    db.refresh(org)
+    owner = (
+        insert(Membership)
+        .from_select(
+            ["org_id", "user_id", "role"],
+            select(created.c.id, literal(current_user.id), literal("owner"))
+        )
+        .cte("owner")
+    )
+    org = (await db.execute(select(created).add_cte(owner))).one()
+    await db.commit()
+    _my_orgs_cache.pop(current_user.id, None)
     
     # Log activity
-    log_activity_from_request(
+    await log_activity_from_request(
         db=db,
         request=request,
         action=ActivityAction.ORG_CREATE,
@@ -53,57 +93,45 @@ def create_organization(
         details={"name": org.name}
     )
     
-    return org
+    return OrgOut(**org._mapping)
 
 
 @router.get("/orgs/mine", response_model=List[OrgOut])
-def list_my_organizations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def list_my_organizations(
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """List all organizations the current user belongs to."""
-    memberships = db.execute(
-        select(Membership).where(Membership.user_id == current_user.id)
-    ).scalars().all()
-    
-    org_ids = [m.org_id for m in memberships]
-    if not org_ids:
-        return []
-    
-    orgs = db.execute(
-        select(Organization).where(Organization.id.in_(org_ids))
-    ).scalars().all()
-    
-    return orgs
+    return Response(content=await my_organizations_json(db, current_user.id), media_type="application/json")
+
+
+async def my_organizations_json(db: AsyncSession, user_id: int) -> bytes:
+    """JSON list of a user's organizations (List[OrgOut]), served from the cache when possible."""
+    body = _my_orgs_cache.get(user_id)
+    if body is None:
+        # One round trip: join through the user's memberships instead of fetching org ids first
+        orgs = (await db.execute(
+            select(*_ORG_COLUMNS)
+            .join(Membership, Membership.org_id == Organization.id)
+            .where(Membership.user_id == user_id)
+        )).all()
+        body = _dump_rows(orgs)
+        _my_orgs_cache[user_id] = body
+    return body
 
 
 @router.post("/orgs/{org_id}/invite", response_model=InviteOut, status_code=201)
-def create_invitation(
+async def create_invitation(
     org_id: int,
     payload: InviteIn,
     request: Request,
     background_tasks: BackgroundTasks,
     ctx: tuple = Depends(require_role({"owner", "admin"})),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create an invitation and send email notification. Only owner/admin can invite."""
     current_user, membership = ctx
     
-    # Get organization
-    org = db.execute(select(Organization).where(Organization.id == org_id)).scalars().first()
-    if not org:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Organization not found"
-        )
-    
-    # Validate role
-    if payload.role not in ["owner", "admin", "member"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid role. Must be: owner, admin, or member"
-        )
-    
     # Only owner can invite as owner
     if payload.role == "owner" and membership.role != "owner":
         raise HTTPException(
@@ -111,39 +139,43 @@ def create_invitation(
             detail="Only organization owner can invite as owner"
         )
     
-    # Check if user is already a member
-    existing_member = db.execute(
-        select(Membership).where(
+    # One round trip for the preconditions: the org name (for the email), whether the
+    # invitee is already a member, and whether a pending invitation exists
+    org_name, is_member, is_invited = (await db.execute(select(
+        select(Organization.name).where(Organization.id == org_id).scalar_subquery(),
+        exists().where(
             Membership.org_id == org_id,
-            Membership.user_id == select(User.id).where(User.email == payload.email).scalar_subquery()
+            Membership.user_id == User.id,
+            User.email == payload.email
+        ),
+        exists().where(
+            Invitation.org_id == org_id,
+            Invitation.email == payload.email,
+            Invitation.status == "pending"
+        ),
+    ))).one()
+    
+    if org_name is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Organization not found"
         )
-    ).scalars().first()
     
-    if existing_member:
+    if is_member:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User is already a member of this organization"
         )
     
-    # Check for existing pending invitation
-    existing_invite = db.execute(
-        select(Invitation).where(
-            and_(
-                Invitation.org_id == org_id,
-                Invitation.email == payload.email,
-                Invitation.status == "pending"
-            )
-        )
-    ).scalars().first()
-    
-    if existing_invite:
+    if is_invited:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invitation already sent to this email"
         )
     
     # Create invitation
-    token = str(uuid.uuid4())
+    # 24 random bytes -> 32 URL-safe chars (fits the String(36) column the uuid4 tokens used)
+    token = secrets.token_urlsafe(24)
     expires_at = datetime.now(timezone.utc) + timedelta(days=7)
     
     invitation = Invitation(
@@ -155,11 +187,12 @@ def create_invitation(
         expires_at=expires_at
     )
     db.add(invitation)
-    db.commit()
-    db.refresh(invitation)
+    await db.commit()
+    await db.refresh(invitation)
+    _pending_invites_cache.pop(str(payload.email), None)
     
     # Log activity
-    log_activity_from_request(
+    await log_activity_from_request(
         db=db,
         request=request,
         action=ActivityAction.INVITATION_CREATE,
@@ -170,203 +203,214 @@ def create_invitation(
         details={"email": payload.email, "role": payload.role}
     )
     
-    # Send invitation email in background (don't fail invitation creation if email fails)
-    try:
-        send_invitation_email(
-            email=payload.email,
-            organization_name=org.name,
-            inviter_name=current_user.name,
-            role=payload.role,
-            invitation_token=token,
-            background_tasks=background_tasks
-        )
-    except Exception as e:
-        # Log error but don't fail invitation creation
-        print(f"[WARNING] Failed to send invitation email: {str(e)}")
-        # Invitation is still created and can be accepted via UI
+    # Send invitation email in background (failures are logged by the task; the
+    # invitation is still created and can be accepted via UI)
+    send_invitation_email(
+        email=payload.email,
+        organization_name=org_name,
+        inviter_name=current_user.name,
+        role=payload.role,
+        invitation_token=token,
+        background_tasks=background_tasks
+    )
     
     return invitation
 
 
 @router.get("/orgs/invitations/pending", response_model=List[InviteOut])
-def list_pending_invitations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def list_pending_invitations(
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """List all pending invitations for the current user's email."""
-    invitations = db.execute(
-        select(Invitation)
-        .where(
-            and_(
-                Invitation.email == current_user.email,
-                Invitation.status == "pending",
-                or_(
-                    Invitation.expires_at.is_(None),
-                    Invitation.expires_at > datetime.now(timezone.utc)
+    return Response(content=await pending_invitations_json(db, current_user.email), media_type="application/json")
+
+
+async def pending_invitations_json(db: AsyncSession, email: str) -> bytes:
+    """JSON list of the unexpired pending invitations for an email (List[InviteOut]), cached."""
+    body = _pending_invites_cache.get(email)
+    if body is None:
+        invitations = (await db.execute(
+            select(*_INVITE_COLUMNS)
+            .where(
+                and_(
+                    Invitation.email == email,
+                    Invitation.status == "pending",
+                    or_(
+                        Invitation.expires_at.is_(None),
+                        Invitation.expires_at > datetime.now(timezone.utc)
+                    )
                 )
             )
-        )
-    ).scalars().all()
-    
-    return invitations
+        )).all()
+        body = _dump_rows(invitations)
+        _pending_invites_cache[email] = body
+    return body
 
 
 @router.post("/orgs/accept", response_model=MemberOut, status_code=201)
-def accept_invitation(
+async def accept_invitation(
     payload: InviteAccept,
     request: Request,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """Accept an invitation and join the organization."""
-    invitation = db.execute(
-        select(Invitation).where(Invitation.token == payload.token)
-    ).scalars().first()
-    
-    if not invitation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Invitation not found"
-        )
-    
-    if invitation.status != "pending":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invitation already {invitation.status}"
+    # Happy path in one statement: flip the pending invitation to accepted and insert the
+    # membership from the returned row. The row lock on the invitation serializes concurrent
+    # accepts; ON CONFLICT turns an existing membership into "no row" instead of a unique violation.
+    accepted = (
+        update(Invitation)
+        .where(
+            Invitation.token == payload.token,
+            Invitation.status == "pending",
+            Invitation.email == current_user.email,
+            or_(Invitation.expires_at.is_(None), Invitation.expires_at > func.now())
         )
-    
-    if invitation.email != current_user.email:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="This invitation was sent to a different email address"
+        .values(status="accepted")
+        .returning(Invitation.org_id, Invitation.role, Invitation.email)
+        .cte("accepted")
+    )
+    joined = (
+        pg_insert(Membership)
+        .from_select(
+            ["org_id", "user_id", "role"],
+            select(accepted.c.org_id, literal(current_user.id), accepted.c.role)
         )
-    
-    if invitation.expires_at and invitation.expires_at < datetime.now(timezone.utc):
+        .on_conflict_do_nothing(index_elements=[Membership.org_id, Membership.user_id])
+        .returning(Membership.id, Membership.created_at)
+        .cte("joined")
+    )
+    row = (await db.execute(
+        select(accepted.c.org_id, accepted.c.role, accepted.c.email, joined.c.id, joined.c.created_at)
+        .select_from(accepted.outerjoin(joined, true()))
+    )).first()
+    
+    if row is None:
+        # Nothing accepted: look the invitation up to report why
+        invitation = (await db.execute(
+            select(Invitation).where(Invitation.token == payload.token)
+        )).scalars().first()
+        
+        if not invitation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Invitation not found"
+            )
+        
+        if invitation.status != "pending":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invitation already {invitation.status}"
+            )
+        
+        if invitation.email != current_user.email:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="This invitation was sent to a different email address"
+            )
+        
         invitation.status = "expired"
-        db.commit()
+        await db.commit()
+        _pending_invites_cache.pop(current_user.email, None)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invitation has expired"
         )
     
-    # Check if already a member
-    existing = db.execute(
-        select(Membership).where(
-            Membership.org_id == invitation.org_id,
-            Membership.user_id == current_user.id
-        )
-    ).scalars().first()
+    await db.commit()
+    _pending_invites_cache.pop(current_user.email, None)
     
-    if existing:
-        invitation.status = "accepted"
-        db.commit()
+    if row.id is None:
+        # The invitation is consumed either way, as before
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You are already a member of this organization"
         )
-    
-    # Create membership
-    membership = Membership(
-        org_id=invitation.org_id,
-        user_id=current_user.id,
-        role=invitation.role
-    )
-    db.add(membership)
-    
-    # Update invitation status
-    invitation.status = "accepted"
-    
-    db.commit()
-    db.refresh(membership)
-    
-    # Log activity
-    log_activity_from_request(
-        db=db,
-        request=request,
-        action=ActivityAction.INVITATION_ACCEPT,
-        user_id=current_user.id,
-        resource_type=ResourceType.MEMBERSHIP,
-        resource_id=membership.id,
-        organization_id=invitation.org_id,
-        details={"role": invitation.role, "invitation_email": invitation.email}
-    )
-    
-    # Also log membership creation
-    log_activity_from_request(
-        db=db,
-        request=request,
-        action=ActivityAction.MEMBERSHIP_CREATE,
-        user_id=current_user.id,
-        resource_type=ResourceType.MEMBERSHIP,
-        resource_id=membership.id,
-        organization_id=invitation.org_id,
-        details={"role": invitation.role}
-    )
+    _my_orgs_cache.pop(current_user.id, None)
+    
+    # Log the acceptance and the resulting membership together
+    await log_activities_from_request(db=db, request=request, entries=[
+        dict(
+            action=ActivityAction.INVITATION_ACCEPT,
+            user_id=current_user.id,
+            resource_type=ResourceType.MEMBERSHIP,
+            resource_id=row.id,
+            organization_id=row.org_id,
+            details={"role": row.role, "invitation_email": row.email},
+        ),
+        dict(
+            action=ActivityAction.MEMBERSHIP_CREATE,
+            user_id=current_user.id,
+            resource_type=ResourceType.MEMBERSHIP,
+            resource_id=row.id,
+            organization_id=row.org_id,
+            details={"role": row.role},
+        ),
+    ])
     
     # Return member with user info (we already have current_user)
     return MemberOut(
-        id=membership.id,
-        user_id=membership.user_id,
-        org_id=membership.org_id,
-        role=membership.role,
-        created_at=membership.created_at,
+        id=row.id,
+        user_id=current_user.id,
+        org_id=row.org_id,
+        role=row.role,
+        created_at=row.created_at,
         user_email=current_user.email,
         user_name=current_user.name
     )
 
 
 @router.get("/orgs/{org_id}/members", response_model=List[MemberOut])
-def list_members(
+async def list_members(
     org_id: int,
     ctx: tuple = Depends(require_role()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all members of an organization. Any member can view."""
-    members = db.execute(
-        select(Membership, User)
+    """
+    List all members of an organization. Any member can view.
+    
+    The list is unbounded, so it is streamed as a JSON array from a server-side cursor
+    instead of being built in memory.
+    """
+    stmt = (
+        select(*_MEMBER_COLUMNS)
         .join(User, Membership.user_id == User.id)
         .where(Membership.org_id == org_id)
-    ).all()
-    
-    return [
-        MemberOut(
-            id=m.Membership.id,
-            user_id=m.Membership.user_id,
-            org_id=m.Membership.org_id,
-            role=m.Membership.role,
-            created_at=m.Membership.created_at,
-            user_email=m.User.email,
-            user_name=m.User.name
-        )
-        for m in members
-    ]
+        .execution_options(yield_per=_MEMBER_STREAM_BATCH)
+    )
+    return StreamingResponse(_stream_members(stmt), media_type="application/json")
+
+
+async def _stream_members(stmt):
+    # The request's session is closed once the response starts, so stream from our own
+    async with SessionLocal() as db:
+        result = await db.stream(stmt)
+        sep = b"["
+        async for rows in result.partitions():
+            yield sep + _dump_rows(rows)[1:-1]
+            sep = b","
+        yield b"[]" if sep == b"[" else b"]"
 
 
 @router.patch("/orgs/{org_id}/members/{user_id}", response_model=MemberOut)
-def update_member_role(
+async def update_member_role(
     org_id: int,
     user_id: int,
     payload: UpdateMemberRole,
     ctx: tuple = Depends(require_role({"owner", "admin"})),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a member's role. Only owner/admin can update."""
     current_user, membership = ctx
     
-    # Validate role
-    if payload.role not in ["owner", "admin", "member"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid role. Must be: owner, admin, or member"
-        )
-    
     # Get target membership
-    target_membership = db.execute(
+    target_membership = (await db.execute(
         select(Membership).where(
             Membership.org_id == org_id,
             Membership.user_id == user_id
         )
-    ).scalars().first()
+    )).scalars().first()
     
     if not target_membership:
         raise HTTPException(
@@ -384,15 +428,15 @@ def update_member_role(
     # Prevent changing own role if you're the only owner
     if target_membership.user_id == current_user.id and target_membership.role == "owner":
         # Check if there are other owners
-        other_owners = db.execute(
-            select(Membership).where(
+        other_owner = (await db.execute(
+            select(Membership.id).where(
                 Membership.org_id == org_id,
                 Membership.role == "owner",
                 Membership.user_id != current_user.id
-            )
-        ).scalars().first()
+            ).limit(1)
+        )).scalar()
         
-        if not other_owners:
+        if other_owner is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot change role: you are the only owner"
@@ -400,11 +444,12 @@ def update_member_role(
     
     # Update role
     target_membership.role = payload.role
-    db.commit()
-    db.refresh(target_membership)
+    await db.commit()
+    await db.refresh(target_membership)
+    invalidate_membership_cache(user_id, org_id)
     
     # Get user info
-    user = db.execute(select(User).where(User.id == user_id)).scalars().first()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     
     return MemberOut(
         id=target_membership.id,
@@ -418,22 +463,22 @@ def update_member_role(
 
 
 @router.delete("/orgs/{org_id}/members/{user_id}", status_code=204)
-def remove_member(
+async def remove_member(
     org_id: int,
     user_id: int,
     ctx: tuple = Depends(require_role({"owner", "admin"})),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Remove a member from organization. Only owner/admin can remove."""
     current_user, membership = ctx
     
     # Get target membership
-    target_membership = db.execute(
+    target_membership = (await db.execute(
         select(Membership).where(
             Membership.org_id == org_id,
             Membership.user_id == user_id
         )
-    ).scalars().first()
+    )).scalars().first()
     
     if not target_membership:
         raise HTTPException(
@@ -450,21 +495,23 @@ def remove_member(
     
     # Prevent removing yourself if you're the only owner
     if target_membership.user_id == current_user.id and target_membership.role == "owner":
-        other_owners = db.execute(
-            select(Membership).where(
+        other_owner = (await db.execute(
+            select(Membership.id).where(
                 Membership.org_id == org_id,
                 Membership.role == "owner",
                 Membership.user_id != current_user.id
-            )
-        ).scalars().first()
+            ).limit(1)
+        )).scalar()
         
-        if not other_owners:
+        if other_owner is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Cannot remove yourself: you are the only owner"
             )
     
-    db.delete(target_membership)
-    db.commit()
+    await db.delete(target_membership)
+    await db.commit()
+    invalidate_membership_cache(user_id, org_id)
+    _my_orgs_cache.pop(user_id, None)
     return None
 
@@ -1,37 +1,45 @@
 from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from backend.app.deps.auth import get_current_user, get_db
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from backend.app.deps.auth import get_current_user_ctx, UserCtx, get_db, invalidate_user_cache
 from backend.app.models.user import User
 from backend.app.utils.email import send_email_background, send_email
 
 router = APIRouter()
 
+TEST_SUBJECT = "Test Email from SaaS Dashboard"
+TEST_BODY = """
+    <h1>Test Email</h1>
+    <p>This is a test email from your SaaS Dashboard.</p>
+    <p>If you received this, the Resend email service is working correctly!</p>
+    """
+
+BACKGROUND_TEST_SUBJECT = "Background Test Email from SaaS Dashboard"
+BACKGROUND_TEST_BODY = """
+    <h1>Background Test Email</h1>
+    <p>This email was sent as a background task.</p>
+    <p>If you received this, background email processing is working!</p>
+    """
+
 
 @router.post("/test-email")
 async def test_email(
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user)
+    current_user: UserCtx = Depends(get_current_user_ctx)
 ):
     """
     Test endpoint to send a test email using Resend.
     Only works when RESEND_API_KEY is configured.
     """
-    from fastapi import HTTPException
-    
-    test_subject = "Test Email from SaaS Dashboard"
-    test_body = """
-    <h1>Test Email</h1>
-    <p>This is a test email from your SaaS Dashboard.</p>
-    <p>If you received this, the Resend email service is working correctly!</p>
-    """
-    
     try:
         # Send email to current user
-        result = await send_email(
+        # send_email blocks on the Resend HTTP call; keep it off the event loop
+        result = await run_in_threadpool(
+            send_email,
             recipients=[current_user.email],
-            subject=test_subject,
-            body=test_body
+            subject=TEST_SUBJECT,
+            body=TEST_BODY
         )
         
         return {
@@ -51,25 +59,18 @@ async def test_email(
 @router.post("/test-email-background")
 async def test_email_background(
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user)
+    current_user: UserCtx = Depends(get_current_user_ctx)
 ):
     """
     Test endpoint to send a test email in background.
     This demonstrates async background task processing.
     """
-    test_subject = "Background Test Email from SaaS Dashboard"
-    test_body = """
-    <h1>Background Test Email</h1>
-    <p>This email was sent as a background task.</p>
-    <p>If you received this, background email processing is working!</p>
-    """
-    
     # Schedule email to be sent in background
     send_email_background(
         background_tasks=background_tasks,
         recipients=[current_user.email],
-        subject=test_subject,
-        body=test_body
+        subject=BACKGROUND_TEST_SUBJECT,
+        body=BACKGROUND_TEST_BODY
     )
     
     return {
@@ -80,23 +81,25 @@ async def test_email_background(
 
 
 @router.delete("/delete-user/{email}")
-def delete_user_by_email(
+async def delete_user_by_email(
     email: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserCtx = Depends(get_current_user_ctx),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Test endpoint to delete a user by email address.
     WARNING: Only use for testing! This permanently deletes the user.
     """
-    user = db.execute(select(User).where(User.email == email)).scalars().first()
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     
     if not user:
         raise HTTPException(status_code=404, detail=f"User with email {email} not found")
     
     user_email = user.email
-    db.delete(user)
-    db.commit()
+    # Core DELETE lets the database apply the ON DELETE rules instead of lazy-loading related rows
+    await db.execute(delete(User).where(User.id == user.id))
+    await db.commit()
+    invalidate_user_cache(user.id)
     
     return {
         "message": f"User {user_email} deleted successfully",
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -20,14 +20,15 @@ class ActivityLogOut(BaseModel):
     user_name: Optional[str] = None
     organization_name: Optional[str] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ActivityLogList(BaseModel):
     """Schema for paginated activity log list."""
     logs: List[ActivityLogOut]
-    total: int
+    total: Optional[int] = None  # only with include_total=true
     page: int
     page_size: int
+    has_next: bool = False
+    next_cursor: Optional[str] = None  # pass as ?cursor= to fetch the next page
 
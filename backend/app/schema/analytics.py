@@ -51,11 +51,11 @@ class ActivityTimeSeries(BaseModel):
 
 
 class DashboardStats(BaseModel):
-    """Combined dashboard statistics."""
-    user_stats: UserStats
-    activity_stats: ActivityStats
-    organization_stats: OrganizationStats
-    activity_timeline: ActivityTimeSeries
+    """Combined dashboard statistics. Sections left out via ?fields= are null."""
+    user_stats: Optional[UserStats] = None
+    activity_stats: Optional[ActivityStats] = None
+    organization_stats: Optional[OrganizationStats] = None
+    activity_timeline: Optional[ActivityTimeSeries] = None
 
 
 class UserGrowthTimeSeries(BaseModel):
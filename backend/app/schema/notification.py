@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -18,17 +18,17 @@ class NotificationOut(BaseModel):
     extra_data: Optional[Dict[str, Any]] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class NotificationList(BaseModel):
     """Schema for paginated notification list."""
     notifications: List[NotificationOut]
-    total: int
+    total: Optional[int] = None  # only with include_total=true
     unread_count: int
     page: int
     page_size: int
+    has_next: bool = False
 
 
 class MarkNotificationRead(BaseModel):
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
 
 class OrgCreate(BaseModel):
@@ -12,13 +12,15 @@ class OrgOut(BaseModel):
     name: str
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+Role = Literal["owner", "admin", "member"]
 
 
 class InviteIn(BaseModel):
     email: EmailStr
-    role: str  # owner, admin, member
+    role: Role
 
 
 class InviteAccept(BaseModel):
@@ -35,8 +37,7 @@ class InviteOut(BaseModel):
     expires_at: Optional[datetime]
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class MemberOut(BaseModel):
@@ -48,10 +49,15 @@ class MemberOut(BaseModel):
     user_email: str
     user_name: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UpdateMemberRole(BaseModel):
-    role: str  # owner, admin, member
+    role: Role
+
 
+class DashboardBootstrap(BaseModel):
+    """What the dashboard shell loads on first paint, in one response."""
+    orgs: List[OrgOut]
+    pending_invitations: List[InviteOut]
+    unread_notifications_count: int
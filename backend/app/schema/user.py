@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 
 class UserCreate(BaseModel):
@@ -16,8 +16,7 @@ class UserOut(BaseModel):
     name: str
     role: str
     avatar_url: Optional[str] = None
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PasswordResetRequest(BaseModel):
     email: EmailStr
@@ -1,14 +1,49 @@
 """
 Activity logging utility functions for tracking user actions and system events.
 """
-from typing import Optional, Dict, Any
-from sqlalchemy.orm import Session
+import random
+from enum import StrEnum
+from typing import Optional, Dict, Any, List, Sequence, Tuple
+from sqlalchemy import insert, Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Request
+from backend.app.core.config import settings
 from backend.app.models.activity import ActivityLog
+from backend.app.utils.activity_buffer import activity_buffer
 
+# Direct (unbuffered) inserts return the whole row, server defaults included
+_INSERT_LOG = insert(ActivityLog).returning(*ActivityLog.__table__.c)
 
-def log_activity(
-    db: Session,
+# Per-action sampling; audit-critical actions should not be listed
+_SAMPLE_RATES = settings.ACTIVITY_SAMPLE_RATES
+
+
+def _sampled_out(action: str, force: bool) -> bool:
+    """True if this entry is dropped by ACTIVITY_SAMPLE_RATES."""
+    rate = _SAMPLE_RATES.get(action)
+    return rate is not None and not force and random.random() >= rate
+
+
+# User agents longer than the column are cut rather than failing the insert
+_USER_AGENT_MAX = ActivityLog.__table__.c.user_agent.type.length
+
+
+def _request_client(request: Request) -> Tuple[Optional[str], Optional[str]]:
+    """(ip_address, user_agent) for the request, read once and kept on request.state."""
+    try:
+        return request.state.activity_client
+    except AttributeError:
+        pass
+    ip_address = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent")
+    if user_agent is not None:
+        user_agent = user_agent[:_USER_AGENT_MAX]
+    request.state.activity_client = (ip_address, user_agent)
+    return ip_address, user_agent
+
+
+async def log_activity(
+    db: AsyncSession,
     action: str,
     user_id: Optional[int] = None,
     resource_type: Optional[str] = None,
@@ -17,10 +52,14 @@ def log_activity(
     details: Optional[Dict[str, Any]] = None,
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None,
-) -> ActivityLog:
+    force: bool = False,
+) -> Optional[Row]:
     """
     Create an activity log entry.
     
+    A Core INSERT ... RETURNING: no ORM instance or unit of work is involved.
+    Actions listed in ACTIVITY_SAMPLE_RATES are only logged at that rate.
+    
     Args:
         db: Database session
         action: Action type (e.g., "user.login", "org.create", "member.add")
@@ -31,30 +70,34 @@ def log_activity(
         details: Additional context as a dictionary (will be stored as JSON)
         ip_address: IP address of the client (optional)
         user_agent: User agent string (optional)
+        force: Log even if the action is sampled
     
     Returns:
-        The created ActivityLog instance
+        The created row (attribute access like an ActivityLog: row.id, row.created_at, ...),
+        or None if the entry was sampled out
     """
-    log = ActivityLog(
-        user_id=user_id,
-        action=action,
-        resource_type=resource_type,
-        resource_id=resource_id,
-        organization_id=organization_id,
-        details=details,
-        ip_address=ip_address,
-        user_agent=user_agent,
-    )
+    if _sampled_out(action, force):
+        return None
     
-    db.add(log)
-    db.commit()
-    db.refresh(log)
+    log = (await db.execute(
+        _INSERT_LOG.values(
+            user_id=user_id,
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            organization_id=organization_id,
+            details=details,
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+    )).one()
+    await db.commit()
     
     return log
 
 
-def log_activity_from_request(
-    db: Session,
+async def log_activity_from_request(
+    db: AsyncSession,
     request: Request,
     action: str,
     user_id: Optional[int] = None,
@@ -62,13 +105,19 @@ def log_activity_from_request(
     resource_id: Optional[int] = None,
     organization_id: Optional[int] = None,
     details: Optional[Dict[str, Any]] = None,
-) -> ActivityLog:
+    force: bool = False,
+) -> Optional[Row]:
     """
     Create an activity log entry with IP address and user agent extracted from the request.
     
     This is a convenience function that automatically extracts:
     - IP address from request.client.host
-    - User agent from request.headers.get("user-agent")
+    - User agent from request.headers.get("user-agent"), cut to the column length
+    
+    Both are read once per request and cached on request.state.
+    
+    While the app is running the entry is queued on the activity buffer and written
+    in a batch shortly after; outside the app lifespan it is inserted directly.
     
     Args:
         db: Database session
@@ -79,19 +128,30 @@ def log_activity_from_request(
         resource_id: ID of the affected resource (optional)
         organization_id: ID of the organization (if applicable)
         details: Additional context as a dictionary
+        force: Log even if the action is sampled (see ACTIVITY_SAMPLE_RATES)
     
     Returns:
-        The created ActivityLog instance
+        The created row, or None if the entry was buffered or sampled out
     """
-    # Extract IP address
-    ip_address = None
-    if request.client:
-        ip_address = request.client.host
+    if _sampled_out(action, force):
+        return None
     
-    # Extract user agent
-    user_agent = request.headers.get("user-agent")
+    ip_address, user_agent = _request_client(request)
     
-    return log_activity(
+    if activity_buffer.running:
+        await activity_buffer.log(
+            action=action,
+            user_id=user_id,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            organization_id=organization_id,
+            details=details,
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+        return None
+    
+    return await log_activity(
         db=db,
         action=action,
         user_id=user_id,
@@ -101,11 +161,58 @@ def log_activity_from_request(
         details=details,
         ip_address=ip_address,
         user_agent=user_agent,
+        force=True,  # already sampled above
     )
 
 
-# Common action constants for consistency
-class ActivityAction:
+
+async def log_activities_from_request(
+    db: AsyncSession,
+    request: Request,
+    entries: List[Dict[str, Any]],
+) -> Optional[Sequence[Row]]:
+    """
+    Create several activity log entries for one request.
+    
+    Each entry takes the keyword arguments of log_activity_from_request (action,
+    user_id, resource_type, ..., force). The IP address and user agent are read from the
+    request once. While the app is running the entries are queued on the activity
+    buffer; outside the app lifespan they are inserted with one statement.
+    
+    Args:
+        db: Database session
+        request: FastAPI Request object
+        entries: Activity entries as keyword-argument dictionaries
+    
+    Returns:
+        The created rows, or None if the entries were buffered
+    """
+    entries = [
+        {k: v for k, v in entry.items() if k != "force"}
+        for entry in entries
+        if not _sampled_out(entry["action"], entry.get("force", False))
+    ]
+    if not entries:
+        return []
+    
+    ip_address, user_agent = _request_client(request)
+    
+    if activity_buffer.running:
+        for entry in entries:
+            await activity_buffer.log(**entry, ip_address=ip_address, user_agent=user_agent)
+        return None
+    
+    # One executemany INSERT ... RETURNING for all entries
+    logs = (await db.execute(
+        _INSERT_LOG,
+        [{**entry, "ip_address": ip_address, "user_agent": user_agent} for entry in entries]
+    )).all()
+    await db.commit()
+    return logs
+
+# Common action constants for consistency. StrEnum members are str, so they bind,
+# compare and serialize exactly like the plain strings stored in activity_logs.
+class ActivityAction(StrEnum):
     """Standard action names for activity logging."""
     
     # User actions
@@ -136,7 +243,7 @@ class ActivityAction:
 
 
 # Common resource types for consistency
-class ResourceType:
+class ResourceType(StrEnum):
     """Standard resource type names for activity logging."""
     USER = "user"
     ORGANIZATION = "organization"
@@ -0,0 +1,152 @@
+"""
+Buffered activity logging.
+
+Request handlers enqueue activity rows instead of inserting them one at a time.
+A background task drains the queue and writes each batch with a single COPY
+(asyncpg copy_records_to_table), flushing every ACTIVITY_FLUSH_INTERVAL seconds
+or ACTIVITY_BATCH_SIZE rows, whichever comes first.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+import asyncpg
+from backend.app.core.config import settings
+from backend.app.db.session import engine, json_dumps
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = (
+    "user_id",
+    "action",
+    "resource_type",
+    "resource_id",
+    "organization_id",
+    "details",
+    "ip_address",
+    "user_agent",
+    "created_at",
+)
+
+_STOP = object()
+
+
+class ActivityBuffer:
+    """Queue of pending activity_logs rows, flushed in batches by a background task."""
+
+    def __init__(self, flush_interval: float, batch_size: int, max_pending: int):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything still queued and stop the background task."""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def log(
+        self,
+        action: str,
+        user_id: Optional[int] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[int] = None,
+        organization_id: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> None:
+        """Queue an activity row. Waits only if the buffer is full (backpressure)."""
+        await self._queue.put((
+            user_id,
+            action,
+            resource_type,
+            resource_id,
+            organization_id,
+            json_dumps(details) if details is not None else None,
+            ip_address,
+            user_agent,
+            datetime.now(timezone.utc),  # time of the event, not of the flush
+        ))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch: List[tuple] = [item]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, batch: List[tuple]) -> None:
+        try:
+            async with engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                driver_conn = raw.driver_connection
+                try:
+                    await self._copy(driver_conn, batch)
+                except asyncpg.ForeignKeyViolationError:
+                    # A user/org was deleted while its rows were queued; with a direct insert the
+                    # rows would have been SET NULL by the FK, so do the same here and retry.
+                    await self._copy(driver_conn, await self._null_missing_refs(driver_conn, batch))
+        except Exception as e:
+            # Activity logging must never take the API down; drop the batch and report it
+            logger.warning("Failed to write %d activity log(s): %s", len(batch), e)
+
+    @staticmethod
+    async def _copy(driver_conn, batch: List[tuple]) -> None:
+        await driver_conn.copy_records_to_table("activity_logs", records=batch, columns=_COLUMNS)
+
+    @staticmethod
+    async def _null_missing_refs(driver_conn, batch: List[tuple]) -> List[tuple]:
+        user_col, org_col = _COLUMNS.index("user_id"), _COLUMNS.index("organization_id")
+        user_ids = list({row[user_col] for row in batch if row[user_col] is not None})
+        org_ids = list({row[org_col] for row in batch if row[org_col] is not None})
+        users = {r[0] for r in await driver_conn.fetch("SELECT id FROM users WHERE id = ANY($1::int[])", user_ids)}
+        orgs = {r[0] for r in await driver_conn.fetch("SELECT id FROM organizations WHERE id = ANY($1::int[])", org_ids)}
+        fixed = []
+        for row in batch:
+            row = list(row)
+            if row[user_col] not in users:
+                row[user_col] = None
+            if row[org_col] not in orgs:
+                row[org_col] = None
+            fixed.append(tuple(row))
+        return fixed
+
+
+activity_buffer = ActivityBuffer(
+    flush_interval=settings.ACTIVITY_FLUSH_INTERVAL,
+    batch_size=settings.ACTIVITY_BATCH_SIZE,
+    max_pending=settings.ACTIVITY_MAX_PENDING,
+)
@@ -0,0 +1,70 @@
+"""
+Periodic cleanup of unreferenced avatar files.
+
+Avatars are stored content-addressed (see utils/storage.store_upload), so one
+file may back several users and replaced avatars are not deleted inline. A
+background task removes files no users.avatar_url points to every
+AVATAR_SWEEP_INTERVAL seconds, skipping anything written or reused within
+AVATAR_SWEEP_GRACE seconds (an upload whose URL is not committed yet).
+"""
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from backend.app.core.config import settings
+from backend.app.db.session import SessionLocal
+from backend.app.models.user import User
+from backend.app.utils.storage import sweep_unreferenced
+
+logger = logging.getLogger(__name__)
+
+AVATAR_URL_PREFIX = "/uploads/avatars/"
+
+
+async def sweep_avatars() -> int:
+    """Delete unreferenced avatar files. Returns the number removed."""
+    async with SessionLocal() as db:
+        urls = (await db.execute(
+            select(User.avatar_url).where(User.avatar_url.startswith(AVATAR_URL_PREFIX)).distinct()
+        )).scalars().all()
+    referenced = {url[len(AVATAR_URL_PREFIX):] for url in urls}
+    return await run_in_threadpool(
+        sweep_unreferenced, Path(settings.AVATAR_DIR), referenced, settings.AVATAR_SWEEP_GRACE
+    )
+
+
+class AvatarSweeper:
+    """Background task that sweeps the avatar directory on an interval."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                removed = await sweep_avatars()
+                if removed:
+                    logger.info("Removed %d unreferenced avatar file(s)", removed)
+            except Exception as e:
+                logger.warning("Failed to sweep avatars: %s", e)
+
+
+avatar_sweeper = AvatarSweeper(interval=settings.AVATAR_SWEEP_INTERVAL)
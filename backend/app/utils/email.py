@@ -1,22 +1,66 @@
+import logging
+import requests
 import resend
+import resend.request
+from requests.adapters import HTTPAdapter
+from datetime import datetime
 from fastapi import BackgroundTasks
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
 from pathlib import Path
 from backend.app.core.config import settings
+from backend.app.utils.email_queue import email_queue
 from typing import List, Optional
 
+logger = logging.getLogger(__name__)
+
 # Configure Resend API key
 if settings.RESEND_API_KEY:
     resend.api_key = settings.RESEND_API_KEY
 
-# Setup Jinja2 for email templates
+# The Resend SDK (pinned in requirements.txt) sends each call with requests.request,
+# i.e. a new connection and TLS handshake per email. Route its requests through one
+# keep-alive session instead, with a connection per email worker. The patch relies on
+# the SDK's private header builder; if an upgrade drops it, the stock sender is kept.
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=settings.EMAIL_WORKERS))
+
+
+def _pooled_make_request(self: resend.request.Request, url: str) -> requests.Response:
+    return _http.request(self.verb, url, json=self.params, headers=self._Request__get_headers())
+
+
+if hasattr(resend.request.Request, "_Request__get_headers"):
+    resend.request.Request.make_request = _pooled_make_request
+else:
+    logger.warning("resend.request.Request has no header builder to reuse; Resend calls are not pooled")
+
+# Setup Jinja2 for email templates. Templates ship with the code, so they are compiled
+# once and never re-checked on disk; the bytecode cache (in the system temp dir) lets new
+# workers skip parsing/compiling them, and they are all loaded here, before any send.
 template_dir = Path(__file__).parent.parent / "templates" / "email"
 template_dir.mkdir(parents=True, exist_ok=True)
 env = Environment(
     loader=FileSystemLoader(str(template_dir)),
-    autoescape=select_autoescape(["html", "xml"])
+    autoescape=select_autoescape(["html", "xml"]),
+    bytecode_cache=FileSystemBytecodeCache(),
+    auto_reload=False,
+    cache_size=-1,
 )
 
+def _current_year() -> int:
+    return datetime.now().year
+
+
+# Values shared by every email; templates build their links from frontend_url
+env.globals.update(current_year=_current_year, frontend_url=settings.FRONTEND_URL)
+
+for _name in env.list_templates(extensions=["html"]):
+    try:
+        env.get_template(_name)
+    except Exception as e:
+        # Same leniency as render_email_template: a broken template must not stop the app
+        logger.warning("Failed to compile email template %s: %s", _name, e)
+
 
 def render_email_template(template_name: str, context: dict) -> str:
     """Render an email template with the given context."""
@@ -38,6 +82,10 @@ def send_email(
     """
     Send an email using Resend API.
     
+    Blocking (the Resend SDK makes a synchronous HTTP call): run it on the email
+    queue, in BackgroundTasks or through run_in_threadpool, never directly on the
+    event loop.
+    
     Args:
         recipients: List of email addresses
         subject: Email subject
@@ -54,8 +102,7 @@ def send_email(
     if not settings.RESEND_API_KEY:
         # Email not configured, raise error instead of silently failing
         error_msg = "RESEND_API_KEY is not configured. Please set it in your .env file."
-        print(f"[ERROR] {error_msg}")
-        print(f"[EMAIL NOT CONFIGURED] Would send to {recipients}: {subject}")
+        logger.error("%s Would have sent %r to %d recipient(s)", error_msg, subject, len(recipients))
         raise ValueError(error_msg)
     
     # Ensure Resend API key is set
@@ -77,26 +124,27 @@ def send_email(
         data = Emails.send(params)
         
         if data and hasattr(data, 'get') and data.get('id'):
-            print(f"[SUCCESS] Email sent successfully to {recipients}. ID: {data.get('id')}")
+            logger.info("Email %r sent to %d recipient(s), id %s", subject, len(recipients), data.get('id'))
         else:
-            print(f"[WARNING] Email API call returned unexpected response: {data}")
+            logger.warning("Email API call returned unexpected response: %s", data)
         
         return data
     except Exception as e:
         error_msg = str(e)
-        print(f"[ERROR] Failed to send email: {error_msg}")
         
         # For Resend domain/verification issues, log warning but don't raise
         # This allows the app to continue working even if email fails
         if "only send testing emails to your own email address" in error_msg.lower():
-            print(f"[WARNING] Email not sent due to Resend limitation. Verify domain at resend.com/domains")
-            print(f"[INFO] Once you verify your domain and set MAIL_FROM in .env, emails will work")
+            logger.warning(
+                "Email not sent due to Resend limitation (%s). Verify your domain at "
+                "resend.com/domains and set MAIL_FROM in .env", error_msg
+            )
             # Return None instead of raising - allows graceful degradation
             return None
         
         # For other errors, log but don't raise in background tasks
         # This prevents email failures from breaking the app
-        print(f"[WARNING] Email sending failed: {error_msg}")
+        logger.error("Email sending failed: %s", error_msg)
         return None
 
 
@@ -108,8 +156,29 @@ def send_email_background(
     from_email: Optional[str] = None,
     from_name: Optional[str] = None
 ):
-    """Schedule an email to be sent in the background."""
-    background_tasks.add_task(send_email, recipients, subject, body, from_email, from_name)
+    """Schedule an email to be sent in the background (email queue, else BackgroundTasks)."""
+    if not email_queue.submit(send_email, recipients, subject, body, from_email, from_name):
+        background_tasks.add_task(send_email, recipients, subject, body, from_email, from_name)
+
+
+def _send_rendered(recipients: List[str], subject: str, template_name: str, context: dict):
+    """
+    Email job: render a template and send it.
+    
+    All the work (template rendering and the Resend API call) happens here, on the
+    email queue or in a background task. Failures are logged, never raised: the
+    request that scheduled the email has already completed.
+    """
+    try:
+        send_email(recipients, subject, render_email_template(template_name, context))
+    except Exception as e:
+        logger.warning("Failed to send email %r: %s", subject, e)
+
+
+def _queue_rendered(background_tasks: BackgroundTasks, recipients: List[str], subject: str, template_name: str, context: dict):
+    """Hand an email to the email queue; fall back to BackgroundTasks outside the app lifespan or when it is full."""
+    if not email_queue.submit(_send_rendered, recipients, subject, template_name, context):
+        background_tasks.add_task(_send_rendered, recipients, subject, template_name, context)
 
 
 def send_invitation_email(
@@ -131,23 +200,17 @@ def send_invitation_email(
         invitation_token: Unique token for accepting the invitation
         background_tasks: Background tasks for async sending
     """
-    from datetime import datetime
-    
-    invitation_url = f"{settings.FRONTEND_URL}/invitations?token={invitation_token}"
-    
     context = {
         "organization_name": organization_name,
         "inviter_name": inviter_name,
         "role": role.capitalize(),
-        "invitation_url": invitation_url,
-        "current_year": datetime.now().year,
+        "invitation_token": invitation_token,
     }
     
     subject = f"You've been invited to join {organization_name}"
-    body = render_email_template("invitation.html", context)
     
-    # Schedule email to be sent in background
-    send_email_background(background_tasks, [email], subject, body)
+    # Rendering and sending both happen off the request path
+    _queue_rendered(background_tasks, [email], subject, "invitation.html", context)
 
 
 def send_welcome_email(
@@ -163,21 +226,14 @@ def send_welcome_email(
         user_name: User's name
         background_tasks: Background tasks for async sending
     """
-    from datetime import datetime
-    
-    dashboard_url = f"{settings.FRONTEND_URL}/dashboard"
-    
     context = {
         "user_name": user_name,
-        "dashboard_url": dashboard_url,
-        "current_year": datetime.now().year,
     }
     
     subject = "Welcome to SaaS Dashboard!"
-    body = render_email_template("welcome.html", context)
     
-    # Schedule email to be sent in background
-    send_email_background(background_tasks, [email], subject, body)
+    # Rendering and sending both happen off the request path
+    _queue_rendered(background_tasks, [email], subject, "welcome.html", context)
 
 
 def send_password_reset_email(
@@ -195,18 +251,12 @@ def send_password_reset_email(
         reset_token: Password reset token
         background_tasks: Background tasks for async sending
     """
-    from datetime import datetime
-    
-    reset_url = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
-    
     context = {
         "user_name": user_name,
-        "reset_url": reset_url,
-        "current_year": datetime.now().year,
+        "reset_token": reset_token,
     }
     
     subject = "Reset Your Password - SaaS Dashboard"
-    body = render_email_template("password_reset.html", context)
     
-    # Schedule email to be sent in background
-    send_email_background(background_tasks, [email], subject, body)
+    # Rendering and sending both happen off the request path
+    _queue_rendered(background_tasks, [email], subject, "password_reset.html", context)
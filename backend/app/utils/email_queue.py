@@ -0,0 +1,71 @@
+"""
+In-process email queue.
+
+Transactional emails are queued here instead of on each request's BackgroundTasks.
+A fixed pool of EMAIL_WORKERS tasks sends them (the blocking Resend call runs in
+the threadpool), so email throughput is a concurrency knob independent of request
+traffic, and shutdown drains whatever is still queued instead of dropping it.
+"""
+import asyncio
+import logging
+from typing import Callable, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from backend.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class EmailQueue:
+    """Queue of pending email jobs, sent by a fixed number of worker tasks."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Send everything still queued and stop the workers."""
+        if not self.running:
+            return
+        for _ in self._tasks:
+            await self._queue.put(_STOP)
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+
+    def submit(self, job: Callable[..., None], *args) -> bool:
+        """Queue a blocking send job. Returns False if the queue is stopped or full."""
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait((job, args))
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            job, args = item
+            try:
+                await run_in_threadpool(job, *args)
+            except Exception as e:
+                # A failed email must never stop the worker
+                logger.warning("Email job failed: %s", e)
+
+
+email_queue = EmailQueue(workers=settings.EMAIL_WORKERS, max_pending=settings.EMAIL_MAX_PENDING)
@@ -1,10 +1,18 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+from jose import JWTError, jwt, jwk
 from backend.app.core.config import settings
 
 ALGORITHM = "HS256"
 
+# Built once: given a plain string, jose re-derives the HMAC key on every call (and on
+# decode first tries to parse it as a JSON JWK, failing with an exception each time)
+_KEY = jwk.construct(settings.JWT_SECRET, ALGORITHM)
+# Decode settings shared by every verify: one algorithm, and every token we issue
+# carries exp and sub (aud is never set, so don't look for it)
+_ALGORITHMS = [ALGORITHM]
+_DECODE_OPTIONS = {"require_exp": True, "require_sub": True, "verify_aud": False}
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -12,19 +20,22 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[dict]:
+    # Not header.payload.signature: reject before any base64/JSON/HMAC work
+    if token.count(".") != 2:
+        return None
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _KEY, algorithms=_ALGORITHMS, options=_DECODE_OPTIONS)
         return payload
     except JWTError:
         return None
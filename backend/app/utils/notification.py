@@ -1,13 +1,16 @@
 """
 Notification utility functions for creating user notifications.
 """
+from datetime import timedelta
 from typing import Optional, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy import Integer, case, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.app.models.notification import Notification
 
 
-def create_notification(
-    db: Session,
+async def create_notification(
+    db: AsyncSession,
     user_id: int,
     type: str,
     title: str,
@@ -16,6 +19,7 @@ def create_notification(
     related_resource_type: Optional[str] = None,
     related_resource_id: Optional[int] = None,
     extra_data: Optional[Dict[str, Any]] = None,
+    coalesce_window: Optional[float] = None,
 ) -> Notification:
     """
     Create a notification for a user.
@@ -30,10 +34,21 @@ def create_notification(
         related_resource_type: Type of related resource (e.g., "invitation", "organization")
         related_resource_id: ID of the related resource (optional)
         extra_data: Additional data as a dictionary (will be stored as JSON)
+        coalesce_window: If set, an unread notification with the same user, type and
+            related resource created within this many seconds is reused instead of
+            inserting a new row; its extra_data["count"] is incremented
     
     Returns:
-        The created Notification instance
+        The created (or coalesced) Notification instance
     """
+    if coalesce_window:
+        notification = await _coalesce(
+            db, user_id, type, related_resource_type, related_resource_id, coalesce_window
+        )
+        if notification is not None:
+            await db.commit()
+            return notification
+
     notification = Notification(
         user_id=user_id,
         type=type,
@@ -45,13 +60,53 @@ def create_notification(
         extra_data=extra_data,
     )
     
+    # The INSERT returns the server defaults (id, created_at, ...) and sessions don't
+    # expire on commit, so no refresh SELECT is needed
     db.add(notification)
-    db.commit()
-    db.refresh(notification)
+    await db.commit()
     
     return notification
 
 
+async def _coalesce(
+    db: AsyncSession,
+    user_id: int,
+    type: str,
+    related_resource_type: Optional[str],
+    related_resource_id: Optional[int],
+    window: float,
+) -> Optional[Notification]:
+    """Bump the count on a recent matching unread notification in one UPDATE ... RETURNING."""
+    # extra_data may be SQL NULL or a JSON null; only an object can be merged into
+    current = case(
+        (func.jsonb_typeof(Notification.extra_data) == "object", Notification.extra_data),
+        else_=cast(literal("{}"), JSONB),
+    )
+    count = func.coalesce(cast(current["count"].astext, Integer), 1) + 1
+    target = (
+        select(Notification.id)
+        .where(
+            Notification.user_id == user_id,
+            Notification.type == type,
+            Notification.related_resource_type.is_not_distinct_from(related_resource_type),
+            Notification.related_resource_id.is_not_distinct_from(related_resource_id),
+            Notification.is_read.is_(False),
+            Notification.created_at > func.now() - timedelta(seconds=window),
+        )
+        .order_by(Notification.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Notification)
+        .where(Notification.id == target)
+        .values(extra_data=current.op("||")(func.jsonb_build_object("count", count)))
+        .returning(Notification)
+        .execution_options(populate_existing=True)
+    )
+    return (await db.execute(stmt)).scalars().first()
+
+
 # Common notification types for consistency
 class NotificationType:
     """Standard notification type names."""
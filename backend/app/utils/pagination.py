@@ -0,0 +1,31 @@
+"""
+Pagination helpers: keyset cursors for feeds ordered by (created_at DESC, id DESC),
+and the cap on page-number (OFFSET) pagination depth.
+"""
+import base64
+from datetime import datetime
+from typing import Tuple
+from fastapi import HTTPException
+from backend.app.core.config import settings
+
+
+def check_offset(page: int, page_size: int, detail: str = "Page too deep; use cursor-based pagination for deep results") -> None:
+    """Reject page/page_size pairs whose OFFSET exceeds MAX_PAGINATION_OFFSET (the DB scans every skipped row)."""
+    if (page - 1) * page_size > settings.MAX_PAGINATION_OFFSET:
+        raise HTTPException(status_code=400, detail=detail)
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque cursor pointing just past the given row."""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor. Raises 400 for cursors this API did not issue."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, id = base64.urlsafe_b64decode(padded).decode().rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
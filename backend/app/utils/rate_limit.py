@@ -0,0 +1,48 @@
+"""
+Request rate limits for the expensive unauthenticated auth endpoints, per client
+IP and, for login and password reset, per target email.
+
+Counters are fixed windows kept in-process (per worker): with N workers a client
+can get up to N times the limit, which still bounds the password-hashing CPU an
+attacker can burn per worker.
+"""
+import math
+import time
+from cachetools import TTLCache
+from fastapi import HTTPException, Request, status
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimit:
+    """
+    Allows `limit` requests per key per window, given as e.g. "5/minute". Over the
+    limit it answers 429 with Retry-After.
+
+    As a FastAPI dependency it is keyed by client IP; handlers can also call check()
+    with another key (e.g. the target email). Both run on the event loop, so
+    counter updates never race.
+    """
+
+    def __init__(self, limit: str, maxsize: int = 100_000):
+        count, _, period = limit.partition("/")
+        self.limit = int(count)
+        self.period = _PERIODS[period.strip()]
+        self._hits: TTLCache = TTLCache(maxsize=maxsize, ttl=self.period)
+
+    async def __call__(self, request: Request) -> None:
+        self.check(request.client.host if request.client else "")
+
+    def check(self, key: str) -> None:
+        """Count one request for `key`; raise 429 if it is over the limit."""
+        now = time.time()
+        window = int(now // self.period)
+        hits = self._hits.get((key, window), 0) + 1
+        self._hits[(key, window)] = hits
+        if hits > self.limit:
+            retry_after = math.ceil((window + 1) * self.period - now)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, try again later",
+                headers={"Retry-After": str(retry_after)},
+            )
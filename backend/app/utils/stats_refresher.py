@@ -0,0 +1,83 @@
+"""
+Periodic refresh of the analytics materialized views.
+
+activity_action_counts and activity_resource_type_counts back the
+"activities by action / resource type" stats, and dashboard_stats holds the
+user/activity/organization counters, so dashboard hits read a few rows instead
+of aggregating whole tables. A background task refreshes them on startup and
+then every ANALYTICS_MV_REFRESH_INTERVAL seconds.
+"""
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import text
+from backend.app.core.config import settings
+from backend.app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+MATERIALIZED_VIEWS = ("activity_action_counts", "activity_resource_type_counts", "dashboard_stats")
+
+# Arbitrary application-wide key; held for the refresh transaction only, so a failed
+# refresh cannot leave it locked on a pooled connection
+_REFRESH_LOCK_KEY = 0x5A5D0001
+
+
+async def refresh_materialized_views(min_age: float = 0) -> bool:
+    """
+    Refresh all analytics views in one transaction.
+
+    Returns False without refreshing if another worker holds the refresh lock or
+    dashboard_stats was refreshed less than min_age seconds ago (each worker runs its
+    own timer; this keeps N workers to about one refresh per interval).
+    """
+    async with engine.connect() as conn:
+        async with conn.begin():
+            locked = (await conn.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _REFRESH_LOCK_KEY}
+            )).scalar()
+            if not locked:
+                return False
+            if min_age and (await conn.execute(
+                text("SELECT refreshed_at > now() - make_interval(secs => :age) FROM dashboard_stats"),
+                {"age": min_age},
+            )).scalar():
+                return False
+            for view in MATERIALIZED_VIEWS:
+                # CONCURRENTLY keeps the view readable while it is rebuilt
+                await conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+    return True
+
+
+class StatsRefresher:
+    """Background task that refreshes the analytics views on an interval."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Slightly under the interval so this worker's own next tick is never skipped
+                await refresh_materialized_views(min_age=self.interval * 0.9)
+            except Exception as e:
+                logger.warning("Failed to refresh analytics views: %s", e)
+            await asyncio.sleep(self.interval)
+
+
+stats_refresher = StatsRefresher(interval=settings.ANALYTICS_MV_REFRESH_INTERVAL)
@@ -0,0 +1,125 @@
+"""
+File storage helpers for user uploads.
+"""
+import hashlib
+import os
+import secrets
+import time
+from pathlib import Path
+from typing import BinaryIO, Optional, Set
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_SIZE = 64 * 1024  # 64KB
+
+# Leading bytes that identify each supported image format
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+SNIFF_BYTES = 12
+
+# Stored files get the extension of their detected format, never the client's filename
+IMAGE_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the allowed size while it is being streamed."""
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Return the image MIME type implied by a file's first SNIFF_BYTES bytes, or None."""
+    for signature, mime in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _copy_upload(src: BinaryIO, destination: Path, max_size: int, digest) -> int:
+    """Chunked copy with the size check, feeding every chunk to digest as it goes."""
+    written = 0
+    with open(destination, "wb") as out:
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > max_size:
+                raise UploadTooLarge()
+            digest.update(chunk)
+            out.write(chunk)
+    return written
+
+
+def _store_upload(src: BinaryIO, directory: Path, extension: str, max_size: int) -> str:
+    """Blocking part of store_upload, run as one threadpool call."""
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = directory / f".upload-{secrets.token_hex(8)}"
+    try:
+        digest = hashlib.sha256()
+        _copy_upload(src, tmp, max_size, digest)
+        name = f"{digest.hexdigest()}.{extension}"
+        final = directory / name
+        try:
+            # Same bytes already stored: keep that copy, and bump its mtime so the
+            # sweeper's grace period covers the reference about to be saved
+            os.utime(final)
+            tmp.unlink()
+        except FileNotFoundError:
+            tmp.replace(final)
+        return name
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+async def store_upload(file: UploadFile, directory: Path, extension: str, max_size: int) -> str:
+    """
+    Stream an upload into directory under a content-addressed name, enforcing max_size.
+
+    The file is named <sha256 of its bytes>.<extension>, so identical uploads map to
+    one file and stored files never change (safe to cache forever). The body is
+    copied in chunks and hashed on the way, never held in memory as a whole, in a
+    single threadpool call so the event loop stays free. Because files can be
+    shared, callers never delete them inline; sweep_unreferenced removes the ones
+    nothing points to any more.
+
+    Returns:
+        The stored file name
+    """
+    if file.size is not None and file.size > max_size:
+        raise UploadTooLarge()
+
+    return await run_in_threadpool(_store_upload, file.file, directory, extension, max_size)
+
+
+def sweep_unreferenced(directory: Path, referenced: Set[str], min_age: float) -> int:
+    """
+    Delete files in directory whose names are not in referenced and that were not
+    written or reused in the last min_age seconds. Blocking; returns the count removed.
+    """
+    if not directory.is_dir():
+        return 0
+    cutoff = time.time() - min_age
+    removed = 0
+    for path in directory.iterdir():
+        if path.name in referenced or not path.is_file():
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+async def delete_file(path: Path) -> None:
+    """Remove a file if it exists, without blocking the event loop."""
+    await run_in_threadpool(path.unlink, True)
@@ -0,0 +1,12 @@
+from uvicorn.workers import UvicornWorker as _UvicornWorker
+from backend.app.core.config import settings
+
+
+class UvicornWorker(_UvicornWorker):
+    """Gunicorn worker pinned to uvloop + httptools (both C implementations, via uvicorn[standard])."""
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        # Answer 503 instead of queueing once a worker holds this many connections/tasks
+        "limit_concurrency": settings.WORKER_LIMIT_CONCURRENCY,
+    }
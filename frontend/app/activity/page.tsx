@@ -46,6 +46,7 @@ function ActivityPageContent() {
       const filters: any = {
         page,
         page_size: pageSize,
+        include_total: true, // numbered pager below needs the total
       };
 
       if (filterAction) filters.action = filterAction;
@@ -55,7 +56,7 @@ function ActivityPageContent() {
 
       const data: ActivityLogList = await activityApi.getLogs(filters);
       setLogs(data.logs);
-      setTotal(data.total);
+      setTotal(data.total ?? 0);
     } catch (err: any) {
       if (err.response?.status === 401) {
         router.push('/login');
@@ -3,12 +3,12 @@
 import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import { analyticsApi } from '@/lib/api';
-import { DashboardStats, UserStats, ActivityStats, OrganizationStats } from '@/types/analytics';
+import { DashboardStatsWith, DashboardSection, UserStats, ActivityStats, OrganizationStats } from '@/types/analytics';
 
 export default function AnalyticsPage() {
   const router = useRouter();
   const [loading, setLoading] = useState(true);
-  const [stats, setStats] = useState<DashboardStats | null>(null);
+  const [stats, setStats] = useState<DashboardStatsWith<DashboardSection> | null>(null);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
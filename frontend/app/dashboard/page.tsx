@@ -6,7 +6,10 @@ import { authApi, orgApi, analyticsApi } from '@/lib/api';
 import { User } from '@/types/user';
 import { useOrg } from '@/contexts/OrgContext';
 import ActivityFeed from '@/components/ActivityFeed';
-import { DashboardStats } from '@/types/analytics';
+import { DashboardStatsWith } from '@/types/analytics';
+
+const SUMMARY_SECTIONS = ['user_stats', 'activity_stats', 'organization_stats'] as const;
+type SummaryStats = DashboardStatsWith<(typeof SUMMARY_SECTIONS)[number]>;
 
 export default function DashboardPage() {
   const router = useRouter();
@@ -15,7 +18,7 @@ export default function DashboardPage() {
   const [orgName, setOrgName] = useState('');
   const [creatingOrg, setCreatingOrg] = useState(false);
   const [orgError, setOrgError] = useState('');
-  const [summaryStats, setSummaryStats] = useState<DashboardStats | null>(null);
+  const [summaryStats, setSummaryStats] = useState<SummaryStats | null>(null);
   const { organizations, refreshOrgs } = useOrg();
 
   useEffect(() => {
@@ -24,7 +27,7 @@ export default function DashboardPage() {
       .then((data) => {
         setUser(data);
         // Load summary stats
-        analyticsApi.getDashboard()
+        analyticsApi.getDashboard([...SUMMARY_SECTIONS])
           .then((stats) => setSummaryStats(stats))
           .catch(() => {
             // Silently fail - analytics is optional
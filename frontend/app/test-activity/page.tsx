@@ -172,7 +172,7 @@ export default function TestActivityPage() {
               <div className="mt-4">
                 <p className="font-semibold">Summary:</p>
                 <ul className="list-disc list-inside mt-2">
-                  <li>Total logs: {result.total}</li>
+                  <li>Has next page: {result.has_next ? 'yes' : 'no'}</li>
                   <li>Page: {result.page}</li>
                   <li>Page size: {result.page_size}</li>
                   <li>Logs on this page: {result.logs.length}</li>
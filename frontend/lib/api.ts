@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { DashboardSection, DashboardStatsWith } from '@/types/analytics';
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -124,8 +125,16 @@ export const orgApi = {
 
 // Analytics API calls
 export const analyticsApi = {
-  getDashboard: async () => {
-    const response = await api.get('/analytics/dashboard');
+  /**
+   * Get dashboard statistics. Pass `fields` to compute only some sections
+   * (the others come back as null).
+   */
+  getDashboard: async <S extends DashboardSection = DashboardSection>(
+    fields?: S[]
+  ): Promise<DashboardStatsWith<S>> => {
+    const params = new URLSearchParams();
+    fields?.forEach((field) => params.append('fields', field));
+    const response = await api.get(`/analytics/dashboard?${params.toString()}`);
     return response.data;
   },
 
@@ -163,7 +172,9 @@ export const activityApi = {
    */
   getLogs: async (filters?: {
     page?: number;
+    cursor?: string;
     page_size?: number;
+    include_total?: boolean;
     user_id?: number;
     action?: string;
     resource_type?: string;
@@ -172,6 +183,8 @@ export const activityApi = {
     const params = new URLSearchParams();
     if (filters) {
       if (filters.page !== undefined) params.append('page', filters.page.toString());
+      if (filters.cursor) params.append('cursor', filters.cursor);
+      if (filters.include_total) params.append('include_total', 'true');
       if (filters.page_size !== undefined) params.append('page_size', filters.page_size.toString());
       if (filters.user_id !== undefined) params.append('user_id', filters.user_id.toString());
       if (filters.action) params.append('action', filters.action);
@@ -15,14 +15,18 @@ export interface ActivityLog {
 
 export interface ActivityLogList {
   logs: ActivityLog[];
-  total: number;
+  total: number | null; // only set when requested with include_total
   page: number;
   page_size: number;
+  has_next: boolean;
+  next_cursor: string | null; // pass as `cursor` to fetch the next page
 }
 
 export interface ActivityLogFilters {
   page?: number;
+  cursor?: string;
   page_size?: number;
+  include_total?: boolean;
   user_id?: number;
   action?: string;
   resource_type?: string;
@@ -46,10 +46,18 @@ export interface UserGrowthTimeSeries {
   data: TimeSeriesDataPoint[];
 }
 
+export type DashboardSection = 'user_stats' | 'activity_stats' | 'organization_stats' | 'activity_timeline';
+
+// Sections not requested via `fields` come back as null
 export interface DashboardStats {
-  user_stats: UserStats;
-  activity_stats: ActivityStats;
-  organization_stats: OrganizationStats;
-  activity_timeline: ActivityTimeSeries;
+  user_stats: UserStats | null;
+  activity_stats: ActivityStats | null;
+  organization_stats: OrganizationStats | null;
+  activity_timeline: ActivityTimeSeries | null;
 }
 
+// A dashboard response for `fields` = S: those sections are present, the rest may be null
+export type DashboardStatsWith<S extends DashboardSection> = DashboardStats & {
+  [K in S]: NonNullable<DashboardStats[K]>;
+};
+
@@ -0,0 +1,15 @@
+# Production server: gunicorn -c gunicorn.conf.py backend.app.main:app
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "backend.app.worker.UvicornWorker"
+
+# Pending connections the kernel queues before refusing; together with the worker's
+# limit_concurrency this bounds how much work piles up under overload.
+backlog = int(os.getenv("BACKLOG", 2048))
+
+timeout = 30
+graceful_timeout = 30  # lets the lifespan flush buffered activity logs on shutdown
+keepalive = 5
@@ -39,7 +39,7 @@ def test_activity_api():
     
     # Test 2: Get all activity logs
     print("2. Getting all activity logs...")
-    response = session.get(f"{API_URL}/activity/logs?page=1&page_size=10")
+    response = session.get(f"{API_URL}/activity/logs?page=1&page_size=10&include_total=true")
     if response.status_code == 200:
         data = response.json()
         print(f"   Found {data['total']} total logs, showing {len(data['logs'])} on page {data['page']}")
@@ -54,7 +54,7 @@ def test_activity_api():
     
     # Test 3: Get my activity logs
     print("3. Getting my activity logs...")
-    response = session.get(f"{API_URL}/activity/logs/me?page=1&page_size=10")
+    response = session.get(f"{API_URL}/activity/logs/me?page=1&page_size=10&include_total=true")
     if response.status_code == 200:
         data = response.json()
         print(f"   Found {data['total']} of my logs")
@@ -68,7 +68,7 @@ def test_activity_api():
     
     # Test 4: Get logs filtered by action
     print("4. Getting logs filtered by action (user.login)...")
-    response = session.get(f"{API_URL}/activity/logs?action=user.login&page=1&page_size=10")
+    response = session.get(f"{API_URL}/activity/logs?action=user.login&page=1&page_size=10&include_total=true")
     if response.status_code == 200:
         data = response.json()
         print(f"   Found {data['total']} logs with action 'user.login'")
@@ -95,7 +95,7 @@ def test_activity_api():
     
     # Test 6: Test pagination
     print("6. Testing pagination (page 1, size 5)...")
-    response = session.get(f"{API_URL}/activity/logs?page=1&page_size=5")
+    response = session.get(f"{API_URL}/activity/logs?page=1&page_size=5&include_total=true")
     if response.status_code == 200:
         data = response.json()
         print(f"   Page: {data['page']}, Page Size: {data['page_size']}")
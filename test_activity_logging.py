@@ -3,13 +3,14 @@
 Test script for activity logging utility.
 Run this from the project root: python test_activity_logging.py
 """
+import asyncio
 import sys
 from backend.app.db.session import SessionLocal
 from backend.app.utils.activity import log_activity, ActivityAction, ResourceType
 from backend.app.models.activity import ActivityLog
 from sqlalchemy import select
 
-def test_activity_logging():
+async def test_activity_logging():
     """Test the activity logging utility functions."""
     db = SessionLocal()
     
@@ -18,7 +19,7 @@ def test_activity_logging():
         
         # Test 1: Basic activity log
         print("1. Creating a basic activity log...")
-        log1 = log_activity(
+        log1 = await log_activity(
             db=db,
             action=ActivityAction.USER_LOGIN,
             user_id=1,  # Assuming user ID 1 exists
@@ -35,7 +36,7 @@ def test_activity_logging():
         
         # Test 2: Organization activity
         print("2. Creating an organization activity log...")
-        log2 = log_activity(
+        log2 = await log_activity(
             db=db,
             action=ActivityAction.ORG_CREATE,
             user_id=1,
@@ -50,11 +51,11 @@ def test_activity_logging():
         
         # Test 3: Query recent logs
         print("3. Querying recent activity logs...")
-        recent_logs = db.execute(
+        recent_logs = (await db.execute(
             select(ActivityLog)
             .order_by(ActivityLog.created_at.desc())
             .limit(5)
-        ).scalars().all()
+        )).scalars().all()
         
         print(f"   Found {len(recent_logs)} recent logs:")
         for log in recent_logs:
@@ -70,8 +71,8 @@ def test_activity_logging():
         traceback.print_exc()
         sys.exit(1)
     finally:
-        db.close()
+        await db.close()
 
 if __name__ == "__main__":
-    test_activity_logging()
+    asyncio.run(test_activity_logging())
 